@@ -0,0 +1,53 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class ResponseCache:
+    """Bounded LRU of encoded response bodies for one invoice data version.
+
+    Moving to a newer version drops every entry, so a body is only ever
+    served under the version it was computed for."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.version: Optional[int] = None
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def set_version(self, version: int) -> None:
+        if self.version is not None and version <= self.version:
+            return
+        if self._entries:
+            self.invalidations += 1
+        self.version = version
+        self._entries.clear()
+
+    def get(self, key: str) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key: str, version: int, body: bytes) -> None:
+        # The data may have changed while the body was being built
+        if version != self.version or self.max_entries <= 0:
+            return
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations
+        }
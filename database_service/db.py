@@ -0,0 +1,105 @@
+import os
+import asyncio
+from datetime import date
+from typing import Any, AsyncIterator, Iterable, List, Optional, Set
+
+import asyncpg # type: ignore
+
+# Pool settings. asyncpg prepares every query once per connection and keeps it
+# in an LRU keyed by the SQL text, so the hot queries below are built with
+# placeholders only and their text stays stable between calls.
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+DB_COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", "60"))
+# Budget for a whole streamed CSV export. asyncpg applies one timeout to the
+# entire COPY, including time the sink waits on a slow client, and falls back
+# to DB_COMMAND_TIMEOUT when none is given, so exports get their own setting.
+DB_EXPORT_TIMEOUT = float(os.getenv("DB_EXPORT_TIMEOUT", str(24 * 3600)))
+
+# Invoice columns as the API returns them. Used inside row_to_json() so that
+# Postgres produces the JSON text and Python never builds per-row dicts.
+INVOICE_JSON_COLUMNS = "id, invoice_number, supplier_name, amount::float8 AS amount, date_created, due_date"
+
+pool: asyncpg.Pool
+
+# Years whose invoices partition is known to exist (see migration 003)
+known_partition_years: Set[int] = set()
+
+
+async def connect(dsn: str) -> asyncpg.Pool:
+    global pool
+    pool = await asyncpg.create_pool(
+        dsn,
+        min_size=DB_POOL_MIN_SIZE,
+        max_size=DB_POOL_MAX_SIZE,
+        statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+        command_timeout=DB_COMMAND_TIMEOUT,
+    )
+    return pool
+
+
+async def disconnect() -> None:
+    await pool.close()
+
+
+def pool_stats() -> dict:
+    return {
+        "size": pool.get_size(),
+        "idle": pool.get_idle_size(),
+        "min_size": pool.get_min_size(),
+        "max_size": pool.get_max_size(),
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE
+    }
+
+
+async def ensure_invoice_partitions(dates: Iterable[date]) -> None:
+    """Create the yearly invoices partitions that a write is about to need."""
+    for year in sorted({value.year for value in dates} - known_partition_years):
+        await pool.execute("SELECT ensure_invoice_partition($1)", date(year, 1, 1))
+        known_partition_years.add(year)
+
+
+class SqlArgs:
+    """Collects positional query arguments and hands out $n placeholders."""
+
+    def __init__(self) -> None:
+        self.values: List[Any] = []
+
+    def add(self, value: Any) -> str:
+        self.values.append(value)
+        return f"${len(self.values)}"
+
+
+async def iterate(query: str, args: List[Any], prefetch: int) -> AsyncIterator[asyncpg.Record]:
+    """Walk a server-side cursor; only `prefetch` rows are held at a time."""
+    async with pool.acquire() as connection:
+        async with connection.transaction():
+            async for record in connection.cursor(query, *args, prefetch=prefetch):
+                yield record
+
+
+async def copy_query_csv(query: str, args: List[Any], queue_size: int = 8) -> AsyncIterator[bytes]:
+    """Stream `COPY (query) TO STDOUT` as CSV chunks, as Postgres produces them."""
+    queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(maxsize=queue_size)
+
+    async def forward(chunk: bytes) -> None:
+        await queue.put(bytes(chunk))
+
+    async def produce() -> None:
+        try:
+            async with pool.acquire() as connection:
+                await connection.copy_from_query(
+                    query, *args, output=forward, format="csv", header=True,
+                    timeout=DB_EXPORT_TIMEOUT
+                )
+        finally:
+            await queue.put(None)
+
+    task = asyncio.create_task(produce())
+    try:
+        while (chunk := await queue.get()) is not None:
+            yield chunk
+        await task
+    finally:
+        task.cancel()
@@ -0,0 +1,113 @@
+-- Incrementally maintained invoice totals used by the /invoices/summary endpoints.
+-- Statement-level triggers fold each write into the affected groups, so reads
+-- cost O(groups) instead of O(invoices).
+
+CREATE TABLE invoice_monthly_totals (
+    supplier_name VARCHAR(255) NOT NULL,
+    month DATE NOT NULL,
+    invoice_count INTEGER NOT NULL,
+    total_amount DECIMAL(14,2) NOT NULL,
+    PRIMARY KEY (supplier_name, month)
+);
+
+CREATE TABLE invoice_due_totals (
+    supplier_name VARCHAR(255) NOT NULL,
+    due_date DATE NOT NULL,
+    invoice_count INTEGER NOT NULL,
+    total_amount DECIMAL(14,2) NOT NULL,
+    PRIMARY KEY (supplier_name, due_date)
+);
+
+CREATE INDEX idx_invoice_monthly_totals_month ON invoice_monthly_totals(month);
+CREATE INDEX idx_invoice_due_totals_due_date ON invoice_due_totals(due_date);
+
+INSERT INTO invoice_monthly_totals (supplier_name, month, invoice_count, total_amount)
+SELECT supplier_name, date_trunc('month', date_created)::date, count(*), sum(amount)
+FROM invoices
+GROUP BY 1, 2;
+
+INSERT INTO invoice_due_totals (supplier_name, due_date, invoice_count, total_amount)
+SELECT supplier_name, due_date, count(*), sum(amount)
+FROM invoices
+GROUP BY 1, 2;
+
+CREATE FUNCTION refresh_invoice_totals() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE invoice_monthly_totals t
+        SET invoice_count = t.invoice_count - d.invoice_count,
+            total_amount = t.total_amount - d.total_amount
+        FROM (
+            SELECT supplier_name, date_trunc('month', date_created)::date AS month,
+                   count(*) AS invoice_count, sum(amount) AS total_amount
+            FROM old_rows
+            GROUP BY 1, 2
+        ) d
+        WHERE t.supplier_name = d.supplier_name AND t.month = d.month;
+
+        UPDATE invoice_due_totals t
+        SET invoice_count = t.invoice_count - d.invoice_count,
+            total_amount = t.total_amount - d.total_amount
+        FROM (
+            SELECT supplier_name, due_date, count(*) AS invoice_count, sum(amount) AS total_amount
+            FROM old_rows
+            GROUP BY 1, 2
+        ) d
+        WHERE t.supplier_name = d.supplier_name AND t.due_date = d.due_date;
+
+        DELETE FROM invoice_monthly_totals
+        WHERE invoice_count = 0
+          AND (supplier_name, month) IN (
+              SELECT supplier_name, date_trunc('month', date_created)::date FROM old_rows
+          );
+
+        DELETE FROM invoice_due_totals
+        WHERE invoice_count = 0
+          AND (supplier_name, due_date) IN (SELECT supplier_name, due_date FROM old_rows);
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO invoice_monthly_totals AS t (supplier_name, month, invoice_count, total_amount)
+        SELECT supplier_name, date_trunc('month', date_created)::date, count(*), sum(amount)
+        FROM new_rows
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+        ON CONFLICT (supplier_name, month) DO UPDATE
+        SET invoice_count = t.invoice_count + EXCLUDED.invoice_count,
+            total_amount = t.total_amount + EXCLUDED.total_amount;
+
+        INSERT INTO invoice_due_totals AS t (supplier_name, due_date, invoice_count, total_amount)
+        SELECT supplier_name, due_date, count(*), sum(amount)
+        FROM new_rows
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+        ON CONFLICT (supplier_name, due_date) DO UPDATE
+        SET invoice_count = t.invoice_count + EXCLUDED.invoice_count,
+            total_amount = t.total_amount + EXCLUDED.total_amount;
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+CREATE FUNCTION truncate_invoice_totals() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    TRUNCATE invoice_monthly_totals, invoice_due_totals;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER invoices_totals_insert AFTER INSERT ON invoices
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_invoice_totals();
+
+CREATE TRIGGER invoices_totals_update AFTER UPDATE ON invoices
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_invoice_totals();
+
+CREATE TRIGGER invoices_totals_delete AFTER DELETE ON invoices
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_invoice_totals();
+
+CREATE TRIGGER invoices_totals_truncate AFTER TRUNCATE ON invoices
+    FOR EACH STATEMENT EXECUTE FUNCTION truncate_invoice_totals();
@@ -0,0 +1,23 @@
+-- Global data version of the invoices table. Every write statement bumps it
+-- and announces the new value on the invoices_changed channel, which the
+-- database_service replicas use to invalidate their response caches.
+
+CREATE TABLE invoice_data_version (
+    singleton BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (singleton),
+    version BIGINT NOT NULL
+);
+
+INSERT INTO invoice_data_version (version) VALUES (1);
+
+CREATE FUNCTION bump_invoice_data_version() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    new_version BIGINT;
+BEGIN
+    UPDATE invoice_data_version SET version = version + 1 RETURNING version INTO new_version;
+    PERFORM pg_notify('invoices_changed', new_version::text);
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER invoices_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON invoices
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_invoice_data_version();
@@ -0,0 +1,132 @@
+-- Range-partition invoices by date_created (one partition per year).
+--
+-- A unique index on a partitioned table must contain the partition key, so the
+-- global uniqueness of invoice_number moves to the invoice_numbers registry,
+-- which statement-level triggers keep in sync with the invoices table.
+-- The existing rows are copied once; the old table is dropped at the end.
+
+ALTER TABLE invoices RENAME TO invoices_unpartitioned;
+ALTER TABLE invoices_unpartitioned RENAME CONSTRAINT invoices_pkey TO invoices_unpartitioned_pkey;
+ALTER TABLE invoices_unpartitioned RENAME CONSTRAINT invoices_invoice_number_key TO invoices_unpartitioned_invoice_number_key;
+DROP INDEX idx_invoices_date_created;
+DROP INDEX idx_invoices_supplier;
+ALTER SEQUENCE invoices_id_seq OWNED BY NONE;
+
+CREATE TABLE invoices (
+    id INTEGER NOT NULL DEFAULT nextval('invoices_id_seq'),
+    invoice_number VARCHAR(50) NOT NULL,
+    supplier_name VARCHAR(255) NOT NULL,
+    amount DECIMAL(10,2) NOT NULL,
+    date_created DATE NOT NULL,
+    due_date DATE NOT NULL,
+    PRIMARY KEY (id, date_created)
+) PARTITION BY RANGE (date_created);
+
+ALTER SEQUENCE invoices_id_seq OWNED BY invoices.id;
+
+-- Newest first listing and keyset pages, optionally per supplier
+CREATE INDEX idx_invoices_date_created ON invoices (date_created DESC, id DESC);
+CREATE INDEX idx_invoices_supplier ON invoices (supplier_name, date_created DESC, id DESC);
+-- Overdue / due-soon lookups answered from the index alone
+CREATE INDEX idx_invoices_due_date ON invoices (due_date) INCLUDE (supplier_name, amount);
+
+CREATE FUNCTION ensure_invoice_partition(for_date DATE) RETURNS VOID LANGUAGE plpgsql AS $$
+DECLARE
+    year_start DATE := date_trunc('year', for_date)::date;
+    partition_name TEXT := format('invoices_y%s', to_char(for_date, 'YYYY'));
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF invoices FOR VALUES FROM (%L) TO (%L)',
+        partition_name, year_start, (year_start + INTERVAL '1 year')::date
+    );
+EXCEPTION
+    -- Another session created the same partition concurrently
+    WHEN duplicate_table OR unique_violation THEN
+        NULL;
+END;
+$$;
+
+SELECT ensure_invoice_partition(year_start)
+FROM (
+    SELECT DISTINCT date_trunc('year', date_created)::date AS year_start FROM invoices_unpartitioned
+    UNION
+    SELECT (date_trunc('year', current_date) + INTERVAL '1 year' * offset_years)::date
+    FROM generate_series(-1, 1) AS offset_years
+) years;
+
+INSERT INTO invoices (id, invoice_number, supplier_name, amount, date_created, due_date)
+SELECT id, invoice_number, supplier_name, amount, date_created, due_date
+FROM invoices_unpartitioned;
+
+DROP TABLE invoices_unpartitioned;
+
+CREATE TABLE invoice_numbers (
+    invoice_number VARCHAR(50) PRIMARY KEY,
+    invoice_id INTEGER NOT NULL,
+    date_created DATE NOT NULL
+);
+
+INSERT INTO invoice_numbers (invoice_number, invoice_id, date_created)
+SELECT invoice_number, id, date_created FROM invoices;
+
+CREATE FUNCTION sync_invoice_numbers() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM invoice_numbers r
+        USING old_rows o
+        WHERE r.invoice_number = o.invoice_number;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        -- Raises unique_violation on invoice_numbers_pkey for a duplicate number
+        INSERT INTO invoice_numbers (invoice_number, invoice_id, date_created)
+        SELECT invoice_number, id, date_created FROM new_rows;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE FUNCTION truncate_invoice_numbers() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    TRUNCATE invoice_numbers;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER invoices_numbers_insert AFTER INSERT ON invoices
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_invoice_numbers();
+
+CREATE TRIGGER invoices_numbers_update AFTER UPDATE ON invoices
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_invoice_numbers();
+
+CREATE TRIGGER invoices_numbers_delete AFTER DELETE ON invoices
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_invoice_numbers();
+
+CREATE TRIGGER invoices_numbers_truncate AFTER TRUNCATE ON invoices
+    FOR EACH STATEMENT EXECUTE FUNCTION truncate_invoice_numbers();
+
+-- Triggers from 001 and 002 went away with the old table
+CREATE TRIGGER invoices_totals_insert AFTER INSERT ON invoices
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_invoice_totals();
+
+CREATE TRIGGER invoices_totals_update AFTER UPDATE ON invoices
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_invoice_totals();
+
+CREATE TRIGGER invoices_totals_delete AFTER DELETE ON invoices
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_invoice_totals();
+
+CREATE TRIGGER invoices_totals_truncate AFTER TRUNCATE ON invoices
+    FOR EACH STATEMENT EXECUTE FUNCTION truncate_invoice_totals();
+
+CREATE TRIGGER invoices_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON invoices
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_invoice_data_version();
+
+ANALYZE invoices;
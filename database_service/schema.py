@@ -0,0 +1,37 @@
+from pathlib import Path
+from typing import List
+
+import asyncpg # type: ignore
+
+MIGRATIONS_PATH = Path(__file__).parent / "migrations"
+
+# Arbitrary key for pg_advisory_lock, so replicas starting together
+# do not apply the same migration twice.
+MIGRATIONS_LOCK_ID = 7202501
+
+
+async def apply_migrations(connection: asyncpg.Connection) -> List[str]:
+    """Apply migrations/*.sql files that are not yet recorded in schema_migrations.
+
+    init.sql only runs on an empty data directory, so schema changes after the
+    first start are shipped as numbered migration files instead."""
+    applied_now: List[str] = []
+    await connection.execute("SELECT pg_advisory_lock($1)", MIGRATIONS_LOCK_ID)
+    try:
+        await connection.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            name TEXT PRIMARY KEY,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """)
+        applied = {row["name"] for row in await connection.fetch("SELECT name FROM schema_migrations")}
+        for path in sorted(MIGRATIONS_PATH.glob("*.sql")):
+            if path.name in applied:
+                continue
+            async with connection.transaction():
+                await connection.execute(path.read_text(encoding="utf-8"))
+                await connection.execute("INSERT INTO schema_migrations (name) VALUES ($1)", path.name)
+            applied_now.append(path.name)
+    finally:
+        await connection.execute("SELECT pg_advisory_unlock($1)", MIGRATIONS_LOCK_ID)
+    return applied_now
@@ -0,0 +1,290 @@
+"""In-memory index of the inbox directory.
+
+The index is filled by one scan at startup and then kept current from inotify
+events (Linux, through ctypes; no extra dependency). Only the names reported
+by an event are stat()ed again. Bind mounts from Docker Desktop and network
+filesystems do not always deliver inotify events, so a periodic full rescan
+runs as a fallback; without inotify it is the only update source.
+
+Hidden names (a leading dot) are not indexed: the inbox holds partial uploads
+(`.upload_*.part`) and the hash markers (`.hashes/`) next to the PDFs.
+"""
+import os
+import time
+import bisect
+import struct
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Literal, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+RAW_PREFIX = "raw_"
+PROCESSING_PREFIX = "processing_"
+
+FileState = Literal["pending", "processing", "processed", "other"]
+FILE_STATES: Tuple[FileState, ...] = ("pending", "processing", "processed", "other")
+
+# <linux/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def file_state(name: str) -> FileState:
+    if not name.lower().endswith(".pdf"):
+        return "other"
+    if name.startswith(RAW_PREFIX):
+        return "processed"
+    if name.startswith(PROCESSING_PREFIX):
+        return "processing"
+    return "pending"
+
+
+@dataclass
+class FileEntry:
+    name: str
+    size: int
+    mtime: float
+    state: FileState
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "size": self.size, "mtime": self.mtime, "state": self.state}
+
+
+def is_hidden(name: str) -> bool:
+    return name.startswith(".")
+
+
+def stat_names(directory: Path, names: Iterable[str]) -> Dict[str, Optional[os.stat_result]]:
+    """stat() iba pre zadané mená; None pre zmazané alebo nie-súbory"""
+    result: Dict[str, Optional[os.stat_result]] = {}
+    for name in names:
+        try:
+            stat = os.stat(directory / name)
+            result[name] = stat if (stat.st_mode & 0o170000) == 0o100000 else None
+        except OSError:
+            result[name] = None
+    return result
+
+
+def scan_directory(directory: Path) -> Dict[str, os.stat_result]:
+    result = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            try:
+                if not is_hidden(entry.name) and entry.is_file():
+                    result[entry.name] = entry.stat()
+            except OSError:
+                continue
+    return result
+
+
+def sorted_insert(names: List[str], name: str) -> None:
+    position = bisect.bisect_left(names, name)
+    if position == len(names) or names[position] != name:
+        names.insert(position, name)
+
+
+def sorted_remove(names: List[str], name: str) -> None:
+    position = bisect.bisect_left(names, name)
+    if position < len(names) and names[position] == name:
+        del names[position]
+
+
+class Inotify:
+    """Minimal inotify binding for a single directory."""
+
+    def __init__(self, directory: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        watch = libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if watch < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch failed for {directory}")
+
+    def read_events(self) -> List[Tuple[int, str]]:
+        """(mask, name) pre všetky udalosti, ktoré sú práve k dispozícii"""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "surrogateescape")
+                offset += length
+                events.append((mask, name))
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class FileIndex:
+    """Names, sizes, mtimes and states of the inbox files, updated incrementally.
+
+    Everything is mutated on the event loop; stat() calls run in a thread.
+    Names are additionally kept in sorted lists (all of them and one per
+    state), so the next file to process is the first pending element and a
+    listing page is a slice instead of a sort of the whole index.
+    """
+
+    def __init__(self, directory: Path, rescan_seconds: float):
+        self.directory = directory
+        self.rescan_seconds = rescan_seconds
+        self.entries: Dict[str, FileEntry] = {}
+        self._names: List[str] = []
+        self._by_state: Dict[FileState, List[str]] = {state: [] for state in FILE_STATES}
+        self._pending = self._by_state["pending"]
+        self._dirty: Set[str] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._rescan_task: Optional[asyncio.Task] = None
+        self._inotify: Optional[Inotify] = None
+        self.events = 0
+        self.rescans = 0
+        self.last_rescan: Optional[float] = None
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            self._inotify = Inotify(self.directory)
+            loop.add_reader(self._inotify.fd, self._on_readable)
+        except (OSError, AttributeError) as e:
+            # Iný OS, chýbajúca zložka alebo vyčerpaný limit watchov: ostáva periodický rescan
+            logger.warning("inotify unavailable for %s, using periodic rescan only: %s", self.directory, e)
+            self._inotify = None
+        await self.rescan()
+        self._rescan_task = asyncio.create_task(self._rescan_loop())
+
+    async def stop(self) -> None:
+        for task in (self._rescan_task, self._flush_task):
+            if task is not None:
+                task.cancel()
+        if self._inotify is not None:
+            asyncio.get_running_loop().remove_reader(self._inotify.fd)
+            self._inotify.close()
+            self._inotify = None
+
+    # -- updates -------------------------------------------------------------
+
+    def _on_readable(self) -> None:
+        assert self._inotify is not None
+        for mask, name in self._inotify.read_events():
+            self.events += 1
+            if mask & IN_Q_OVERFLOW:
+                # Udalosti sa stratili, pomôže iba celý rescan
+                asyncio.ensure_future(self.rescan())
+            elif mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                logger.warning("Watched directory %s went away", self.directory)
+            elif name:
+                self._dirty.add(name)
+        self._schedule_flush()
+
+    def touch(self, *names: str) -> None:
+        """Vlastná zmena súboru (napr. premenovanie); nečaká na inotify.
+
+        Mená hneď vypadnú zo zoznamu čakajúcich a po novom stat() sa doň vrátia, ak ešte platia."""
+        for name in names:
+            self._remove_pending(name)
+        self._dirty.update(names)
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._dirty and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        while self._dirty:
+            names, self._dirty = self._dirty, set()
+            stats = await asyncio.to_thread(stat_names, self.directory, names)
+            for name, stat in stats.items():
+                self._apply(name, stat)
+
+    async def rescan(self) -> None:
+        try:
+            stats = await asyncio.to_thread(scan_directory, self.directory)
+        except FileNotFoundError:
+            stats = {}
+        for name in set(self.entries) - set(stats):
+            self._apply(name, None)
+        for name, stat in stats.items():
+            self._apply(name, stat)
+        self.rescans += 1
+        self.last_rescan = time.time()
+
+    async def _rescan_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.rescan_seconds)
+            try:
+                await self.rescan()
+            except OSError as e:
+                logger.warning("Rescan of %s failed: %s", self.directory, e)
+
+    def _apply(self, name: str, stat: Optional[os.stat_result]) -> None:
+        if stat is None or is_hidden(name):
+            entry = self.entries.pop(name, None)
+            if entry is not None:
+                sorted_remove(self._names, name)
+                sorted_remove(self._by_state[entry.state], name)
+            return
+        state = file_state(name)
+        self.entries[name] = FileEntry(name, stat.st_size, stat.st_mtime, state)
+        sorted_insert(self._names, name)
+        sorted_insert(self._by_state[state], name)
+
+    def _remove_pending(self, name: str) -> None:
+        sorted_remove(self._pending, name)
+
+    # -- queries -------------------------------------------------------------
+
+    def pending(self) -> List[str]:
+        """Mená čakajúcich PDF podľa abecedy"""
+        return list(self._pending)
+
+    def with_state(self, state: FileState) -> List[FileEntry]:
+        return [self.entries[name] for name in self._by_state[state]]
+
+    def listing(self, state: Optional[FileState], offset: int, limit: int) -> Tuple[List[FileEntry], int]:
+        """(stránka záznamov, celkový počet) zoradené podľa mena; výrez z udržiavaného zoznamu, bez triedenia"""
+        names = self._names if state is None else self._by_state[state]
+        return [self.entries[n] for n in names[offset:offset + limit]], len(names)
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {"pending": 0, "processing": 0, "processed": 0, "other": 0}
+        for entry in self.entries.values():
+            counts[entry.state] += 1
+        return {
+            "inotify": self._inotify is not None,
+            "files": len(self.entries),
+            "by_state": counts,
+            "events": self.events,
+            "rescans": self.rescans,
+            "rescan_seconds": self.rescan_seconds,
+            "last_rescan": self.last_rescan
+        }
@@ -0,0 +1,161 @@
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from file_index import FileIndex, RAW_PREFIX, PROCESSING_PREFIX
+
+
+def move_noreplace(source: Path, target: Path) -> bool:
+    """Presunie súbor, iba ak cieľ neexistuje; False, ak existuje (FileNotFoundError, ak chýba zdroj)"""
+    try:
+        os.link(source, target)
+    except FileExistsError:
+        return False
+    except FileNotFoundError:
+        raise
+    except OSError:
+        # Súborový systém bez hardlinkov: rename s kontrolou vopred
+        if target.exists():
+            return False
+        source.rename(target)
+        return True
+    source.unlink(missing_ok=True)
+    return True
+
+
+class Inbox:
+    """Claims PDFs in a directory shared by several file_service replicas.
+
+    A file is claimed by hard-linking `name.pdf` to `processing_name.pdf` and
+    then removing `name.pdf`. Unlike rename, link never replaces an existing
+    target, so exactly one replica (or request) wins a claim and nobody's
+    claim in flight is overwritten; the others get FileExistsError or
+    FileNotFoundError and move on to the next file. When processing ends the
+    claim becomes `raw_name.pdf`, on failure it is released back.
+
+    The claim's mtime is its lease: the owner refreshes it while it works
+    (`refresh_leases`), and a claim whose mtime is older than `lease_seconds`
+    is considered abandoned by a crashed replica and renamed back
+    (`recover_expired`). If a new file with the original name arrived in the
+    meantime, the abandoned one is renamed back as `name.recovered-<id>.pdf`
+    so neither of them is lost.
+    """
+
+    def __init__(self, directory: Path, index: FileIndex, lease_seconds: float):
+        self.directory = directory
+        self.index = index
+        self.lease_seconds = lease_seconds
+        self.active: Set[Path] = set()
+        self.claimed = 0
+        self.conflicts = 0
+        self.recovered = 0
+        self.renamed_on_recovery = 0
+
+    def pending(self) -> List[Path]:
+        """PDF súbory čakajúce na spracovanie, zoradené podľa mena (z indexu, bez listovania zložky)"""
+        return [self.directory / name for name in self.index.pending()]
+
+    def claim(self, file: Path) -> Optional[Path]:
+        """Atomicky si zoberie súbor; None, ak ho už má niekto iný"""
+        claimed = file.with_name(PROCESSING_PREFIX + file.name)
+        try:
+            # Lease začína teraz, nie časom poslednej zmeny PDF; mtime sa nastaví ešte pred
+            # presunom, aby iná replika nepovažovala čerstvý claim za opustený
+            os.utime(file)
+            if not move_noreplace(file, claimed):
+                # Rovnomenný súbor v spracovaní: ak je to opustený claim (lease vypršal), odsuň ho
+                # a skús znova, inak by nový súbor nikto nespracoval
+                if claimed in self.active or self._restore(claimed) is None or not move_noreplace(file, claimed):
+                    self.conflicts += 1
+                    return None
+        except FileNotFoundError:
+            # Index ešte nezachytil, že súbor zobral niekto iný
+            self.conflicts += 1
+            self.index.touch(file.name)
+            return None
+        self.index.touch(file.name, claimed.name)
+        self.active.add(claimed)
+        self.claimed += 1
+        return claimed
+
+    def claim_next(self) -> Optional[Tuple[str, Path]]:
+        """Prvý voľný PDF podľa mena: (pôvodné meno, cesta k zabranému súboru)"""
+        for file in self.pending():
+            claimed = self.claim(file)
+            if claimed is not None:
+                return file.name, claimed
+        return None
+
+    def complete(self, claimed: Path, original_name: str) -> str:
+        """Spracovaný súbor dostane prefix raw_"""
+        raw_filename = RAW_PREFIX + original_name
+        claimed.rename(self.directory / raw_filename)
+        self.active.discard(claimed)
+        self.index.touch(claimed.name, raw_filename)
+        return raw_filename
+
+    def release(self, claimed: Path, original_name: str) -> None:
+        """Vráti súbor do inboxu (spracovanie zlyhalo alebo bolo zrušené)"""
+        self.active.discard(claimed)
+        try:
+            claimed.rename(self.directory / original_name)
+        except FileNotFoundError:
+            pass
+        self.index.touch(claimed.name, original_name)
+
+    def refresh_leases(self) -> None:
+        for claimed in list(self.active):
+            try:
+                os.utime(claimed)
+            except FileNotFoundError:
+                self.active.discard(claimed)
+
+    def recover_expired(self) -> List[str]:
+        """Vráti do inboxu súbory, ktorých lease vypršal (replika spadla počas spracovania)"""
+        deadline = time.time() - self.lease_seconds
+        recovered = []
+        for entry in self.index.with_state("processing"):
+            claimed = self.directory / entry.name
+            if claimed in self.active or entry.mtime >= deadline:
+                continue
+            name = self._restore(claimed)
+            if name is not None:
+                recovered.append(name)
+        return recovered
+
+    def _restore(self, claimed: Path) -> Optional[str]:
+        """Vráti opustený claim do inboxu a vráti jeho nové meno; None, ak lease ešte platí
+        alebo súbor medzitým dokončil či obnovil niekto iný"""
+        original = self.directory / claimed.name[len(PROCESSING_PREFIX):]
+        try:
+            # mtime v indexe môže byť starý (lease obnovuje iná replika), rozhoduje aktuálny stat
+            if claimed.stat().st_mtime >= time.time() - self.lease_seconds:
+                return None
+            # Najprv si claim atomicky zober pod skrytým jedinečným menom, aby ho dve repliky
+            # neobnovili obe (každá pod iným menom)
+            taken = self.directory / f".recovering_{uuid.uuid4().hex}.pdf"
+            claimed.rename(taken)
+        except FileNotFoundError:
+            return None
+        target = original
+        if not move_noreplace(taken, original):
+            # Medzitým prišiel nový súbor s rovnakým menom, starý dostane iné meno
+            target = original.with_name(f"{original.stem}.recovered-{uuid.uuid4().hex[:8]}{original.suffix}")
+            taken.rename(target)
+        self.index.touch(claimed.name, target.name)
+        self.recovered += 1
+        if target != original:
+            self.renamed_on_recovery += 1
+        return target.name
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "lease_seconds": self.lease_seconds,
+            "active_claims": len(self.active),
+            "claimed": self.claimed,
+            "conflicts": self.conflicts,
+            "recovered": self.recovered,
+            "renamed_on_recovery": self.renamed_on_recovery
+        }
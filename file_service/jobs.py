@@ -0,0 +1,194 @@
+"""Persistent queue of conversion jobs.
+
+Every job is a JSON file `<id>.json` in the jobs directory, rewritten
+atomically on each state change (queued -> running -> done | failed). After a
+restart the queued jobs are picked up again and jobs that were running are
+put back into the queue. A fixed number of asyncio workers run the jobs
+through a handler supplied by the service, so a conversion never holds an
+HTTP request open; clients poll (or long-poll) the job instead.
+"""
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional
+
+logger = logging.getLogger(__name__)
+
+JobState = Literal["queued", "running", "done", "failed"]
+FINISHED_STATES = ("done", "failed")
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class JobError(Exception):
+    """The job failed; `detail` is stored as the job's error."""
+
+    def __init__(self, detail: str):
+        super().__init__(detail)
+        self.detail = detail
+
+
+def write_json(path: Path, data: Dict[str, Any]) -> None:
+    temporary = path.with_name(f".{path.name}.tmp")
+    temporary.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    os.replace(temporary, path)
+
+
+class JobQueue:
+    """Jobs on disk, their order in memory, and the workers running them.
+
+    Job records are mutated on the event loop only; file writes run in a thread.
+    """
+
+    def __init__(self, directory: Path, workers: int, retention_seconds: float):
+        self.directory = directory
+        self.workers = workers
+        self.retention_seconds = retention_seconds
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._finished: Dict[str, asyncio.Event] = {}
+        self._tasks: List[asyncio.Task] = []
+        self.completed = 0
+        self.failed = 0
+
+    async def start(self, handler: JobHandler, on_requeue: Callable[[Dict[str, Any]], None]) -> None:
+        """Načíta uložené úlohy, nedokončené zaradí znova a spustí workerov.
+
+        on_requeue dostane úlohy, ktoré bežali pri páde/reštarte (napr. na uvoľnenie zabraného súboru)."""
+        records = await asyncio.to_thread(self._load)
+        for job in sorted(records, key=lambda j: j["created"]):
+            self.jobs[job["id"]] = job
+            self._finished[job["id"]] = asyncio.Event()
+            if job["state"] == "running":
+                on_requeue(job)
+                job.update(state="queued", started=None, file=None)
+                await self._save(job)
+            if job["state"] == "queued":
+                self._queue.put_nowait(job["id"])
+            else:
+                self._finished[job["id"]].set()
+        self._tasks = [asyncio.create_task(self._worker(handler)) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        # Bežiace úlohy ostanú na disku ako running a po štarte sa zaradia znova
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _load(self) -> List[Dict[str, Any]]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        records = []
+        for path in self.directory.glob("*.json"):
+            try:
+                records.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError) as e:
+                logger.warning("Skipping unreadable job %s: %s", path.name, e)
+        return records
+
+    async def _save(self, job: Dict[str, Any]) -> None:
+        await asyncio.to_thread(write_json, self.directory / f"{job['id']}.json", dict(job))
+
+    async def submit(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        await self._prune()
+        job = {
+            "id": uuid.uuid4().hex,
+            "state": "queued",
+            "params": params,
+            "created": time.time(),
+            "started": None,
+            "finished": None,
+            "file": None,
+            "result": None,
+            "error": None
+        }
+        # Najprv na disk, až potom do fronty: prijatá úloha prežije reštart
+        await self._save(job)
+        self.jobs[job["id"]] = job
+        self._finished[job["id"]] = asyncio.Event()
+        self._queue.put_nowait(job["id"])
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Úloha po dokončení alebo po uplynutí timeout (long-poll)"""
+        job = self.jobs.get(job_id)
+        if job is None or job["state"] in FINISHED_STATES or timeout <= 0:
+            return job
+        try:
+            await asyncio.wait_for(self._finished[job_id].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.jobs.get(job_id)
+
+    def position(self, job_id: str) -> Optional[int]:
+        """Poradie čakajúcej úlohy vo fronte (0 = ide ďalšia)"""
+        job = self.jobs.get(job_id)
+        if job is None or job["state"] != "queued":
+            return None
+        return sum(1 for j in self.jobs.values() if j["state"] == "queued" and j["created"] < job["created"])
+
+    def listing(self, state: Optional[JobState], limit: int) -> List[Dict[str, Any]]:
+        """Najnovšie úlohy ako prvé"""
+        jobs = [j for j in self.jobs.values() if state is None or j["state"] == state]
+        return sorted(jobs, key=lambda j: j["created"], reverse=True)[:limit]
+
+    async def mark_file(self, job: Dict[str, Any], name: str) -> None:
+        """Zapamätá si zabraný súbor, aby sa dal po reštarte uvoľniť"""
+        job["file"] = name
+        await self._save(job)
+
+    async def _worker(self, handler: JobHandler) -> None:
+        while True:
+            job_id = await self._queue.get()
+            job = self.jobs.get(job_id)
+            if job is None or job["state"] != "queued":
+                continue
+            job.update(state="running", started=time.time())
+            await self._save(job)
+            try:
+                job["result"] = await handler(job)
+                job["state"] = "done"
+                self.completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job["error"] = e.detail if isinstance(e, JobError) else str(e)
+                job["state"] = "failed"
+                self.failed += 1
+            job["finished"] = time.time()
+            await self._save(job)
+            self._finished[job_id].set()
+
+    async def _prune(self) -> None:
+        """Zmaže dokončené úlohy staršie ako retention_seconds"""
+        deadline = time.time() - self.retention_seconds
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job["state"] in FINISHED_STATES and job["finished"] < deadline
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+            del self._finished[job_id]
+        if expired:
+            await asyncio.to_thread(
+                lambda: [(self.directory / f"{job_id}.json").unlink(missing_ok=True) for job_id in expired]
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+        for job in self.jobs.values():
+            counts[job["state"]] += 1
+        return {
+            "path": str(self.directory),
+            "workers": self.workers,
+            "by_state": counts,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retention_seconds": self.retention_seconds
+        }
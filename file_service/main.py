@@ -1,23 +1,103 @@
 
 
 import os
+import re
+import json
 import time
+import base64
+import shutil
+import asyncio
 
 from pathlib import Path
-from fastapi import FastAPI, HTTPException
-from typing import Dict, Any, List
-import base64
-from pdf2image import convert_from_path # type: ignore
-from io import BytesIO
-from PIL import Image
+from dataclasses import asdict
+from fastapi import FastAPI, HTTPException, Query, Depends, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Literal, Optional, Tuple, AsyncIterator
+from contextlib import asynccontextmanager
+from urllib.parse import urlencode
+
+from rendering import (
+    render_pdf_stitched, render_pdf_pages, render_pdf_page, store_document, render_params, page_params,
+    RenderProfile, RenderError, ColorMode, OutputFormat, PROFILES, DEFAULT_PROFILE, FORMATS
+)
+from render_cache import RenderCache, file_sha256, cache_key
+from text_layer import extract_text_layer_to, text_params
+from inbox import Inbox
+from file_index import FileIndex, FileState, RAW_PREFIX, PROCESSING_PREFIX, file_state, is_hidden
+from jobs import JobQueue, JobError, JobState
+from uploads import HashRegistry, UploadTooLarge, NotAPdf, receive_upload
+from workers import RenderPool, QueueFull, PDF_WORKERS, PDF_MAX_CONCURRENCY, PDF_MAX_QUEUE
+
+render_pool = RenderPool(PDF_WORKERS, PDF_MAX_CONCURRENCY, PDF_MAX_QUEUE)
+
+# stitched = jeden obrázok so všetkými stránkami, pages = obrázok pre každú stránku,
+# lazy = nič sa nerenderuje vopred, stránky sa renderujú až pri stiahnutí z /documents/{id}/pages/{n}
+OutputMode = Literal["stitched", "pages", "lazy"]
+
+# Záznam cache s uloženým PDF, z ktorého sa renderujú stránky v režime lazy
+DOCUMENT_PARAMS: Dict[str, Any] = {"kind": "document"}
 
+# Vyrenderované obrázky podľa SHA-256 obsahu PDF a parametrov renderovania
+RENDER_CACHE_PATH = Path(os.getenv("RENDER_CACHE_PATH", "/app/render_cache"))
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+render_cache = RenderCache(RENDER_CACHE_PATH, RENDER_CACHE_MAX_BYTES)
 
-app = FastAPI(title="PDF File Manager", version="1.0.0")
+# Prebiehajúce renderovania podľa kľúča cache (rovnaký obsah sa renderuje iba raz)
+renders_in_flight: Dict[str, "asyncio.Task[Tuple[Path, Dict[str, Any]]]"] = {}
+
+# Kam dávkové spracovanie zapisuje výsledné obrázky
+BATCH_OUTPUT_PATH = Path(os.getenv("BATCH_OUTPUT_PATH", "/app/output"))
 
 # Cesta k zložke s PDF súbormi (bude mount z Docker)
 ENV_FILES_PATH = os.getenv("ENV_FILES_PATH", "/app/files")
 FILES_PATH = Path(ENV_FILES_PATH)
 
+# Index zložky v pamäti (inotify + periodický rescan), aby sa zložka nelistovala pri každej požiadavke
+FILES_RESCAN_SECONDS = float(os.getenv("FILES_RESCAN_SECONDS", "60"))
+file_index = FileIndex(FILES_PATH, FILES_RESCAN_SECONDS)
+
+# Zložku môže spracovávať viac replík naraz; súbor si replika zaberie premenovaním na processing_
+CLAIM_LEASE_SECONDS = float(os.getenv("CLAIM_LEASE_SECONDS", "300"))
+inbox = Inbox(FILES_PATH, file_index, CLAIM_LEASE_SECONDS)
+
+# Asynchrónne úlohy konverzie (fronta na disku, prežije reštart)
+JOBS_PATH = Path(os.getenv("JOBS_PATH", "/app/jobs"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", str(render_pool.max_concurrency)))
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", str(24 * 3600)))
+job_queue = JobQueue(JOBS_PATH, JOB_WORKERS, JOB_RETENTION_SECONDS)
+
+# Nahrávanie PDF cez API; hashe prijatých a spracovaných PDF na odmietanie duplikátov
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(100 * 1024 * 1024)))
+upload_hashes = HashRegistry(Path(os.getenv("UPLOAD_HASHES_PATH", str(FILES_PATH / ".hashes"))))
+
+async def maintain_claims() -> None:
+    """Obnovuje lease vlastných súborov a vracia súbory po spadnutých replikách"""
+    while True:
+        await asyncio.sleep(CLAIM_LEASE_SECONDS / 3)
+        try:
+            inbox.refresh_leases()
+            inbox.recover_expired()
+        except OSError:
+            pass
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup
+    await asyncio.to_thread(render_cache.load)
+    render_pool.start()
+    await file_index.start()
+    claims_task = asyncio.create_task(maintain_claims())
+    await job_queue.start(run_job, release_job_file)
+    yield
+    # Shutdown
+    await job_queue.stop()
+    claims_task.cancel()
+    await file_index.stop()
+    render_pool.shutdown()
+
+app = FastAPI(title="PDF File Manager", version="1.0.0", lifespan=lifespan)
+
 @app.get("/")
 async def root():
     return {"message": "PDF File Manager API"}
@@ -31,80 +111,563 @@ async def health_check() -> Dict[str, Any]:
         "service": "PDF File Manager",
         "version": "0.1.0",
         "files_path": str(FILES_PATH),
-        "files_path_exists": files_exist
+        "files_path_exists": files_exist,
+        "render_pool": render_pool.stats(),
+        "render_cache": render_cache.stats(),
+        "inbox": inbox.stats(),
+        "file_index": file_index.stats(),
+        "jobs": job_queue.stats(),
+        "uploads": upload_hashes.stats()
     }
 
 @app.get("/files")
-async def list_files() -> Dict[str, Any]:
-    """Zoznam všetkých súborov v zložke"""
+async def list_files(
+    state: Optional[FileState] = Query(None, description="pending = čaká na spracovanie, processing, processed = raw_, other = nie PDF"),
+    limit: int = Query(1000, ge=1, le=10000),
+    offset: int = Query(0, ge=0)
+) -> Dict[str, Any]:
+    """Zoznam súborov v zložke (z indexu v pamäti), zoradený podľa mena"""
     try:
         if not FILES_PATH.exists():
             raise HTTPException(status_code=404, detail="Files directory not found")
         
-        files = [f.name for f in FILES_PATH.iterdir() if f.is_file()]
-        return {"files": files, "count": len(files)}
+        entries, total = file_index.listing(state, offset, limit)
+        next_offset = offset + len(entries) if offset + len(entries) < total else None
+        return {
+            "files": [e.name for e in entries],
+            "count": total,
+            "items": [e.to_dict() for e in entries],
+            "limit": limit,
+            "offset": offset,
+            "next_offset": next_offset
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+class RenderOptions(BaseModel):
+    """Profil renderovania a voliteľné prepísanie jeho hodnôt"""
+    profile: str = Field(DEFAULT_PROFILE, description="Názov profilu, pozri GET /profiles")
+    dpi: Optional[int] = Field(None, ge=36, le=600)
+    color: Optional[ColorMode] = None
+    max_edge: Optional[int] = Field(None, ge=256, le=20000, description="Najdlhšia strana jednej stránky v pixeloch")
+    format: Optional[OutputFormat] = None
+    quality: Optional[int] = Field(None, ge=1, le=100)
+
+    def resolve(self) -> RenderProfile:
+        base = PROFILES.get(self.profile)
+        if base is None:
+            raise HTTPException(status_code=400, detail=f"Unknown profile '{self.profile}', available: {', '.join(PROFILES)}")
+        return base.with_overrides(dpi=self.dpi, color=self.color, max_edge=self.max_edge, format=self.format, quality=self.quality)
+
+@app.get("/profiles")
+async def list_profiles() -> Dict[str, Any]:
+    """Dostupné profily renderovania"""
+    return {"default": DEFAULT_PROFILE, "profiles": {name: profile.params() for name, profile in PROFILES.items()}}
+
+# ID obrázka: kľúč záznamu v render cache, pri mode=pages s číslom stránky
+IMAGE_ID_PATTERN = re.compile(r"^(?P<key>[0-9a-f]{64})(?:-(?P<page>[0-9]+))?$")
+
+def image_handle(image_id: str, entry: Path, name: str) -> Dict[str, Any]:
+    return {"image_id": image_id, "image_url": f"/images/{image_id}", "size": (entry / name).stat().st_size}
+
+def load_rendered(key: str, entry: Path, meta: Dict[str, Any], inline: bool) -> Dict[str, Any]:
+    """Popis vyrenderovaných obrázkov; s inline aj samotné dáta v base64"""
+    def describe(image_id: str, name: str) -> Dict[str, Any]:
+        if inline:
+            return {"base64": base64.b64encode((entry / name).read_bytes()).decode('utf-8')}
+        return image_handle(image_id, entry, name)
+
+    if "pages" in meta:
+        pages = [
+            {"page": p["page"], "width": p["width"], "height": p["height"], **describe(f"{key}-{p['page']}", p["file"])}
+            for p in meta["pages"]
+        ]
+        return {"pages": pages, "page_count": meta["page_count"], "format": meta["format"]}
+    return {**describe(key, meta["file"]), "width": meta["width"], "height": meta["height"], "page_count": meta["page_count"], "format": meta["format"]}
+
+def find_image(image_id: str) -> Tuple[Path, str]:
+    """Súbor obrázka podľa ID z /process-file"""
+    match = IMAGE_ID_PATTERN.match(image_id)
+    if match is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    found = render_cache.entry(match["key"])
+    if found is None:
+        raise HTTPException(status_code=404, detail="Image not found (it may have been evicted from the render cache)")
+    entry, meta = found
+    if "format" not in meta:
+        # Záznam s textom alebo uloženým PDF, nie obrázok
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    page = match["page"]
+    if "pages" in meta and page is not None:
+        names = [p["file"] for p in meta["pages"] if p["page"] == int(page)]
+        if names:
+            return entry / names[0], meta["format"]
+    elif "pages" not in meta and page is None:
+        return entry / meta["file"], meta["format"]
+    raise HTTPException(status_code=404, detail="Image not found")
+
+@app.get("/images/{image_id}")
+async def get_image(image_id: str) -> FileResponse:
+    """Vráti vyrenderovaný obrázok ako binárne dáta (podporuje Range požiadavky)"""
+    path, image_format = find_image(image_id)
+    # Obsah pod daným ID sa nikdy nemení (ID je hash PDF a parametrov)
+    return FileResponse(
+        path,
+        media_type=FORMATS[image_format][2],
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
+
+async def render_cached(pdf_sha256: str, file: Path, params: Dict[str, Any], function: Any, *args: Any) -> Tuple[str, Path, Dict[str, Any], bool]:
+    """Spustí function(pdf, staging, *args) v render poole, alebo vráti výsledok z cache, ak sa rovnaký obsah už spracoval.
+
+    Vráti kľúč a adresár záznamu cache, jeho meta a či išlo o zásah cache."""
+    key = cache_key(pdf_sha256, params)
+
+    cached = render_cache.get(key)
+    if cached is not None:
+        entry, meta = cached
+    else:
+        task = renders_in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(render_into_cache(key, file, function, args))
+            renders_in_flight[key] = task
+            task.add_done_callback(lambda _: renders_in_flight.pop(key, None))
+        # shield: odpojenie jedného klienta nezruší renderovanie, na ktoré čakajú aj iní
+        entry, meta = await asyncio.shield(task)
+    return key, entry, meta, cached is not None
+
+async def render_into_cache(key: str, file: Path, function: Any, args: Tuple[Any, ...]) -> Tuple[Path, Dict[str, Any]]:
+    staging = render_cache.staging_dir()
+    try:
+        meta = await render_pool.run(function, str(file), str(staging), *args)
+    except BaseException:
+        await asyncio.to_thread(render_cache.discard, staging)
+        raise
+    # Zápis meta, počítanie veľkosti a mazanie vyhodených záznamov je práca s diskom, nie na event loope
+    return await asyncio.to_thread(render_cache.put, key, staging, meta), meta
+
+def load_text(entry: Path, meta: Dict[str, Any]) -> Dict[str, Any]:
+    pages = json.loads((entry / meta["file"]).read_text(encoding="utf-8"))
+    return {"pages": pages, "page_count": meta["page_count"], "chars": meta["chars"]}
+
+def export_outputs(entry: Path, meta: Dict[str, Any], output_dir: Path, stem: str) -> List[str]:
+    """Skopíruje obrázky zo záznamu cache do výstupnej zložky (hardlink, ak je to možné)"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if "pages" in meta:
+        files = [(p["file"], f"{stem}-p{p['page']:04d}{Path(p['file']).suffix}") for p in meta["pages"]]
+    else:
+        files = [(meta["file"], f"{stem}{Path(meta['file']).suffix}")]
+
+    written = []
+    for source_name, target_name in files:
+        target = output_dir / target_name
+        temporary = output_dir / f".{target_name}.tmp"
+        temporary.unlink(missing_ok=True)
+        try:
+            os.link(entry / source_name, temporary)
+        except OSError:
+            shutil.copyfile(entry / source_name, temporary)
+        os.replace(temporary, target)
+        written.append(str(target))
+    return written
+
+async def process_pdf(
+    original_name: str,
+    claimed: Path,
+    mode: str,
+    profile: RenderProfile,
+    inline: bool,
+    output_dir: Optional[Path] = None,
+    prefer_text: bool = True,
+    text_boxes: bool = False
+) -> Dict[str, Any]:
+    """Skonvertuje zabraný PDF a premenuje ho s prefixom raw_; pri chybe ho vráti do inboxu.
+
+    S prefer_text vráti PDF s textovou vrstvou ako text a renderuje iba skeny."""
+    try:
+        pdf_sha256 = await asyncio.to_thread(file_sha256, claimed)
+
+        # Extrakcia textu aj konverzia PDF bežia v samostatnom procese, event loop ostáva voľný
+        if prefer_text:
+            _, entry, meta, cached = await render_cached(pdf_sha256, claimed, text_params(text_boxes), extract_text_layer_to, text_boxes)
+            if meta["has_text"]:
+                text = await asyncio.to_thread(load_text, entry, meta)
+                if output_dir is not None:
+                    text["output_files"] = await asyncio.to_thread(export_outputs, entry, meta, output_dir, Path(original_name).stem)
+                raw_filename = inbox.complete(claimed, original_name)
+                await asyncio.to_thread(upload_hashes.register, pdf_sha256, original_name)
+                return {
+                    "original_filename": original_name,
+                    "raw_filename": raw_filename,
+                    "content": "text",
+                    **text,
+                    "sha256": pdf_sha256,
+                    "cached": cached
+                }
+
+        if mode == "lazy":
+            # Uloží sa iba PDF; stránky sa vyrenderujú, až keď si ich niekto stiahne
+            _, entry, meta, cached = await render_cached(pdf_sha256, claimed, DOCUMENT_PARAMS, store_document)
+            rendered = document_pages(pdf_sha256, meta["page_count"], profile)
+        else:
+            render = render_pdf_stitched if mode == "stitched" else render_pdf_pages
+            key, entry, meta, cached = await render_cached(pdf_sha256, claimed, render_params(mode, profile), render, profile)
+            rendered = await asyncio.to_thread(load_rendered, key, entry, meta, inline)
+        if output_dir is not None and mode != "lazy":
+            rendered["output_files"] = await asyncio.to_thread(export_outputs, entry, meta, output_dir, Path(original_name).stem)
+
+        # Premenuj pôvodný PDF s prefixom raw_
+        raw_filename = inbox.complete(claimed, original_name)
+        await asyncio.to_thread(upload_hashes.register, pdf_sha256, original_name)
+    except BaseException:
+        inbox.release(claimed, original_name)
+        raise
+
+    return {
+        "original_filename": original_name,
+        "raw_filename": raw_filename,
+        "content": "image",
+        **rendered,
+        "media_type": profile.media_type,
+        "sha256": pdf_sha256,
+        "cached": cached,
+        "mode": mode,
+        "profile": profile.name
+    }
+
 @app.get("/process-file")
-async def process_next_pdf():
-    """Zoberie prvý PDF súbor (bez raw_ prefixu), skonvertuje na JPG a premenuje pôvodný"""
+async def process_next_pdf(
+    mode: OutputMode = Query("stitched", description="stitched = jeden obrázok so všetkými stránkami, pages = obrázok pre každú stránku, lazy = odkazy na stránky renderované až pri stiahnutí"),
+    options: RenderOptions = Depends(),
+    inline: bool = Query(False, description="Vráti obrázok priamo v JSON ako base64 namiesto odkazu na /images/{id}"),
+    prefer_text: bool = Query(True, description="PDF s textovou vrstvou vráti ako text (content=text) namiesto obrázka"),
+    text_boxes: bool = Query(False, description="K textu pridá riadky so súradnicami na stránke")
+):
+    """Zoberie prvý PDF súbor (bez raw_ prefixu), skonvertuje ho na obrázok podľa profilu a premenuje pôvodný.
+
+    Ak má PDF textovú vrstvu, vráti namiesto obrázka text (content=text), pokiaľ nie je prefer_text=false.
+    Obrázok sa stiahne cez GET /images/{image_id}; base64 v odpovedi iba s inline=true."""
     try:
+        profile = options.resolve()
+
         if not FILES_PATH.exists():
             raise HTTPException(status_code=404, detail="Files directory not found")
         
-        # Nájdi prvý PDF súbor bez raw_ prefixu
-        files: List[Path] = [f for f in FILES_PATH.iterdir() if f.is_file() and f.name.lower().endswith('.pdf') and not f.name.startswith('raw_')]
+        # Zaber prvý voľný PDF súbor bez raw_ prefixu (atomicky, aj voči iným replikám)
+        claim = inbox.claim_next()
         
-        if not files:
+        if claim is None:
             return {"message": "no files to process"}
         
-        # Zoradí a vezmi prvý
-        file = sorted(files)[0]
-        original_name = file.name
- 
-        # Konverzia PDF na JPG
-        images: List[Any] = convert_from_path(str(file))
-
-        if not images:
-            raise HTTPException(status_code=500, detail="Could not convert PDF to image")
-
-        # Spoj všetky stránky do jedného obrázka (vertikálne)
-        if len(images) > 1:
-            # Spočítaj celkovú výšku a najväčšiu šírku
-            total_height = sum(img.height for img in images)
-            max_width = max(img.width for img in images)
-
-            # Vytvor nový obrázok
-            combined = Image.new('RGB', (max_width, total_height), 'white')
-
-            # Vlož stránky pod seba
-            y_offset = 0
-            for img in images:
-                combined.paste(img, (0, y_offset))
-                y_offset += img.height
-
-            final_image = combined
-        else:
-            # Iba jedna stránka
-            final_image = images[0]
-        
-        # Konverzia na base64
-        buffer = BytesIO()
-        final_image.save(buffer, format='JPEG', quality=95)
-        img_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        
-        # Premenuj pôvodný PDF s prefixom raw_
-        raw_filename = f"raw_{original_name}"
-        raw_path = FILES_PATH / raw_filename
-        file.rename(raw_path)
-        
-        return {
-            "original_filename": original_name,
-            "raw_filename": raw_filename,
-            "base64": img_base64,
-            "format": "jpeg"
-        }
+        original_name, claimed = claim
+        return await process_pdf(original_name, claimed, mode, profile, inline, None, prefer_text, text_boxes)
         
+    except HTTPException:
+        raise
+    except RenderError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Too many PDFs queued for conversion: {e}")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def run_batch(
+    limit: Optional[int],
+    mode: str,
+    profile: RenderProfile,
+    concurrency: int,
+    output_dir: Optional[Path],
+    prefer_text: bool = True,
+    text_boxes: bool = False
+) -> AsyncIterator[Dict[str, Any]]:
+    """Spracuje čakajúce súbory paralelne a priebežne vracia udalosti v poradí dokončenia"""
+    started = time.monotonic()
+    files = inbox.pending()[:limit]
+    total = len(files)
+    results: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+    remaining = iter(files)
+
+    async def worker() -> None:
+        # Zdieľaný iterátor: každý worker si berie ďalší súbor, keď dokončí predchádzajúci
+        # Každý súbor dá práve jednu udalosť, inak by generátor čakal na results.get() navždy
+        for file in remaining:
+            try:
+                claimed = inbox.claim(file)
+                if claimed is None:
+                    event = {"event": "skipped", "original_filename": file.name, "detail": "claimed by another worker"}
+                else:
+                    event = {"event": "file", **await process_pdf(file.name, claimed, mode, profile, False, output_dir, prefer_text, text_boxes)}
+            except Exception as e:
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                event = {"event": "error", "original_filename": file.name, "detail": detail}
+            await results.put(event)
+
+    tasks = [asyncio.create_task(worker()) for _ in range(min(concurrency, total))]
+    counts = {"file": 0, "error": 0, "skipped": 0}
+    try:
+        yield {"event": "start", "total": total, "concurrency": len(tasks)}
+        for completed in range(1, total + 1):
+            event = await results.get()
+            counts[event["event"]] += 1
+            yield {**event, "completed": completed, "total": total}
+        yield {
+            "event": "done",
+            "total": total,
+            "processed": counts["file"],
+            "failed": counts["error"],
+            "skipped": counts["skipped"],
+            "elapsed_seconds": round(time.monotonic() - started, 3)
+        }
+    finally:
+        # Klient sa odpojil alebo je hotovo: zruš workerov, ich súbory sa vrátia do inboxu
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+@app.post("/process-batch")
+async def process_batch(
+    limit: Optional[int] = Query(None, ge=1, description="Maximálny počet súborov; bez limitu celá zložka"),
+    concurrency: Optional[int] = Query(None, ge=1, description="Počet súčasne spracovaných súborov (predvolene podľa render poolu)"),
+    mode: OutputMode = Query("stitched"),
+    options: RenderOptions = Depends(),
+    stream: bool = Query(True, description="Priebeh ako NDJSON stream (riadok na každý dokončený súbor)"),
+    write_outputs: bool = Query(True, description="Zapíše obrázky do výstupnej zložky (BATCH_OUTPUT_PATH)"),
+    prefer_text: bool = Query(True, description="PDF s textovou vrstvou vráti ako text namiesto obrázka"),
+    text_boxes: bool = Query(False, description="K textu pridá riadky so súradnicami na stránke")
+):
+    """Spracuje viac PDF súborov naraz paralelne; každý sa po konverzii premenuje s prefixom raw_"""
+    profile = options.resolve()
+    if not FILES_PATH.exists():
+        raise HTTPException(status_code=404, detail="Files directory not found")
+
+    events = run_batch(
+        limit,
+        mode,
+        profile,
+        min(concurrency or render_pool.max_concurrency, render_pool.max_concurrency),
+        BATCH_OUTPUT_PATH if write_outputs else None,
+        prefer_text,
+        text_boxes,
+    )
+
+    if stream:
+        async def ndjson() -> AsyncIterator[bytes]:
+            async for event in events:
+                yield (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    results = [event async for event in events]
+    summary = results[-1]
+    return {**{k: v for k, v in summary.items() if k != "event"}, "results": [e for e in results if e["event"] in ("file", "error", "skipped")]}
+
+def release_job_file(job: Dict[str, Any]) -> None:
+    """Úloha bežala pri reštarte: jej zabraný súbor vráť do inboxu, úloha si ho zaberie znova"""
+    if job["file"]:
+        inbox.release(FILES_PATH / (PROCESSING_PREFIX + job["file"]), job["file"])
+
+async def run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Spracuje jeden PDF pre úlohu z fronty; s filename konkrétny súbor, inak ďalší v poradí"""
+    params = job["params"]
+    profile = RenderProfile(**params["profile"])
+    while True:
+        if params["filename"]:
+            claimed = inbox.claim(FILES_PATH / params["filename"])
+            if claimed is None:
+                raise JobError(f"File '{params['filename']}' not found or already being processed")
+            original_name = params["filename"]
+        else:
+            claim = inbox.claim_next()
+            if claim is None:
+                return {"message": "no files to process"}
+            original_name, claimed = claim
+
+        await job_queue.mark_file(job, original_name)
+        try:
+            return await process_pdf(original_name, claimed, params["mode"], profile, False, None, params["prefer_text"], params["text_boxes"])
+        except QueueFull:
+            # Súbor sa vrátil do inboxu; úloha nezlyhá, počká na miesto v poole
+            await asyncio.sleep(1)
+        except RenderError as e:
+            raise JobError(str(e))
+
+def job_params(mode: str, profile: RenderProfile, prefer_text: bool, text_boxes: bool, filename: Optional[str]) -> Dict[str, Any]:
+    return {
+        "mode": mode,
+        "profile": asdict(profile),
+        "prefer_text": prefer_text,
+        "text_boxes": text_boxes,
+        "filename": filename
+    }
+
+def job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {**job, "job_url": f"/jobs/{job['id']}", "position": job_queue.position(job["id"])}
+
+def is_inbox_pdf_name(filename: str) -> bool:
+    """Meno čakajúceho PDF priamo v zložke; skryté mená (.upload_*, .hashes) index nevidí, nikdy by sa nespracovali"""
+    return Path(filename).name == filename and not is_hidden(filename) and file_state(filename) == "pending"
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    mode: OutputMode = Query("stitched"),
+    options: RenderOptions = Depends(),
+    prefer_text: bool = Query(True, description="PDF s textovou vrstvou vráti ako text namiesto obrázka"),
+    text_boxes: bool = Query(False, description="K textu pridá riadky so súradnicami na stránke"),
+    filename: Optional[str] = Query(None, description="Konkrétny PDF v zložke; bez neho ďalší čakajúci v poradí")
+) -> Dict[str, Any]:
+    """Zaradí konverziu do fronty a hneď vráti ID úlohy; stav a výsledok cez GET /jobs/{job_id}"""
+    profile = options.resolve()
+    if filename is not None and not is_inbox_pdf_name(filename):
+        raise HTTPException(status_code=400, detail=f"'{filename}' is not a PDF waiting for processing")
+    job = await job_queue.submit(job_params(mode, profile, prefer_text, text_boxes, filename))
+    return job_view(job)
+
+@app.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=60, description="Long-poll: počká najviac toľko sekúnd, kým sa úloha dokončí")
+) -> Dict[str, Any]:
+    """Stav úlohy (queued, running, done, failed) a po dokončení jej výsledok"""
+    job = await job_queue.wait(job_id, wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_view(job)
+
+@app.get("/jobs")
+async def list_jobs(
+    state: Optional[JobState] = Query(None),
+    limit: int = Query(100, ge=1, le=1000)
+) -> Dict[str, Any]:
+    """Posledné úlohy, najnovšie prvé"""
+    jobs = job_queue.listing(state, limit)
+    return {"jobs": [job_view(job) for job in jobs], "count": len(jobs)}
+
+def document_pages(document_id: str, page_count: int, profile: RenderProfile) -> Dict[str, Any]:
+    """Odkazy na jednotlivé stránky dokumentu s parametrami profilu v URL"""
+    query = urlencode({"profile": profile.name, **{k: v for k, v in profile.params().items() if v is not None}})
+    return {
+        "document_id": document_id,
+        "document_url": f"/documents/{document_id}",
+        "pages": [{"page": n, "image_url": f"/documents/{document_id}/pages/{n}?{query}"} for n in range(1, page_count + 1)],
+        "page_count": page_count,
+        "format": profile.format
+    }
+
+def find_document(document_id: str) -> Tuple[Path, Dict[str, Any]]:
+    """Uložené PDF podľa ID dokumentu (SHA-256 obsahu PDF)"""
+    if not re.fullmatch(r"[0-9a-f]{64}", document_id):
+        raise HTTPException(status_code=404, detail="Document not found")
+    found = render_cache.entry(cache_key(document_id, DOCUMENT_PARAMS))
+    if found is None:
+        raise HTTPException(status_code=404, detail="Document not found (process it with mode=lazy; it may have been evicted from the render cache)")
+    return found
+
+@app.get("/documents/{document_id}")
+async def get_document(document_id: str, options: RenderOptions = Depends()) -> Dict[str, Any]:
+    """Počet stránok dokumentu a odkazy na ne"""
+    _, meta = find_document(document_id)
+    return document_pages(document_id, meta["page_count"], options.resolve())
+
+@app.get("/documents/{document_id}/pages/{page}")
+async def get_document_page(
+    document_id: str,
+    page: int,
+    options: RenderOptions = Depends(),
+    rows: int = Query(1, ge=1, le=8, description="Rozdelí stránku na mriežku rows x cols dlaždíc"),
+    cols: int = Query(1, ge=1, le=8),
+    tile: int = Query(0, ge=0, description="Index dlaždice po riadkoch (0 = vľavo hore)")
+) -> FileResponse:
+    """Vyrenderuje jednu stránku (alebo jej dlaždicu) pri prvom stiahnutí a vráti ju ako binárny obrázok"""
+    profile = options.resolve()
+    entry, meta = find_document(document_id)
+    if not 1 <= page <= meta["page_count"]:
+        raise HTTPException(status_code=404, detail=f"Page {page} not found, the document has {meta['page_count']} pages")
+    if tile >= rows * cols:
+        raise HTTPException(status_code=400, detail=f"Tile {tile} is outside of the {rows}x{cols} grid")
+
+    try:
+        _, page_entry, page_meta, _ = await render_cached(
+            document_id,
+            entry / meta["file"],
+            page_params(profile, page, rows, cols, tile),
+            render_pdf_page,
+            profile, page, rows, cols, tile
+        )
+    except RenderError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Too many PDFs queued for conversion: {e}")
+
+    return FileResponse(
+        page_entry / page_meta["file"],
+        media_type=profile.media_type,
+        # Obsah pod URL sa mení iba so zmenou profilu alebo verzie renderera
+        headers={"Cache-Control": "public, max-age=86400"}
+    )
+
+def publish_upload(temporary: Path, target: Path) -> None:
+    """Sprístupní nahraný súbor pod jeho menom; existujúci súbor sa neprepíše"""
+    try:
+        os.link(temporary, target)
+    except FileExistsError:
+        raise
+    except OSError:
+        # Súborový systém bez hardlinkov
+        if target.exists():
+            raise FileExistsError(target.name)
+        temporary.rename(target)
+
+@app.put("/files/{filename}", status_code=201)
+async def upload_file(
+    filename: str,
+    request: Request,
+    enqueue: bool = Query(False, description="Hneď zaradí súbor do spracovania (ako POST /jobs?filename=...)"),
+    mode: OutputMode = Query("stitched"),
+    options: RenderOptions = Depends(),
+    prefer_text: bool = Query(True),
+    text_boxes: bool = Query(False)
+) -> Dict[str, Any]:
+    """Nahrá PDF (telo požiadavky = obsah súboru) do zložky; zapisuje sa priebežne po kusoch.
+
+    Rovnaký obsah (SHA-256), aký už zložka dostala, sa odmietne s 409."""
+    if not is_inbox_pdf_name(filename):
+        raise HTTPException(status_code=400, detail=f"'{filename}' is not a valid PDF name (must end with .pdf, without raw_/processing_ prefix or leading dot)")
+    if not FILES_PATH.exists():
+        raise HTTPException(status_code=404, detail="Files directory not found")
+    if any((FILES_PATH / name).exists() for name in (filename, PROCESSING_PREFIX + filename, RAW_PREFIX + filename)):
+        raise HTTPException(status_code=409, detail=f"File '{filename}' already exists")
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload is larger than {UPLOAD_MAX_BYTES} bytes")
+    profile = options.resolve()
+
+    try:
+        temporary, pdf_sha256, size = await receive_upload(request.stream(), FILES_PATH, UPLOAD_MAX_BYTES)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except NotAPdf as e:
+        raise HTTPException(status_code=415, detail=str(e))
+
+    try:
+        existing = await asyncio.to_thread(upload_hashes.reserve, pdf_sha256, filename)
+        if existing is not None:
+            raise HTTPException(status_code=409, detail=f"Duplicate of '{existing}' (sha256 {pdf_sha256})")
+        try:
+            await asyncio.to_thread(publish_upload, temporary, FILES_PATH / filename)
+        except BaseException as e:
+            # Súbor sa nesprístupnil: rezervácia hashu by blokovala každé ďalšie nahratie obsahu
+            upload_hashes.release(pdf_sha256)
+            if isinstance(e, FileExistsError):
+                raise HTTPException(status_code=409, detail=f"File '{filename}' already exists")
+            raise
+    finally:
+        temporary.unlink(missing_ok=True)
+    file_index.touch(filename)
+
+    result: Dict[str, Any] = {"filename": filename, "size": size, "sha256": pdf_sha256, "state": "pending"}
+    if enqueue:
+        job = await job_queue.submit(job_params(mode, profile, prefer_text, text_boxes, filename))
+        result["job"] = job_view(job)
+    return result
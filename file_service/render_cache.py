@@ -0,0 +1,142 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+META_FILE = "meta.json"
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        while chunk := source.read(HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(pdf_sha256: str, params: Dict[str, Any]) -> str:
+    encoded = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{pdf_sha256}|{encoded}".encode("utf-8")).hexdigest()
+
+
+def directory_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.iterdir() if f.is_file())
+
+
+class RenderCache:
+    """On-disk cache of rendered PDFs keyed by PDF content hash + render params.
+
+    Each entry is a directory `<key>/` holding the rendered images and a
+    `meta.json`. Entries are published with an atomic rename, so readers never
+    see a half-written one. The total size is kept under `max_bytes` by
+    evicting the least recently used entries (directory mtime, touched on hit).
+
+    `put` does disk work (meta write, size accounting, deleting evicted
+    entries) and is meant to run in a thread; the size table is guarded by a
+    lock so lookups on the event loop can run alongside it.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._sizes: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def load(self) -> None:
+        """Nájdi existujúce záznamy (po reštarte) a zahoď nedokončené"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for entry in self.directory.iterdir():
+            if entry.name.startswith(".") or not (entry / META_FILE).exists():
+                shutil.rmtree(entry, ignore_errors=True)
+                continue
+            self._sizes[entry.name] = (directory_size(entry), entry.stat().st_mtime)
+        self._evict()
+
+    def get(self, key: str) -> Optional[Tuple[Path, Dict[str, Any]]]:
+        found = self.entry(key)
+        if found is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return found
+
+    def entry(self, key: str) -> Optional[Tuple[Path, Dict[str, Any]]]:
+        """Záznam a jeho meta.json; použitie ho posúva na koniec LRU"""
+        with self._lock:
+            if key not in self._sizes:
+                return None
+        entry = self.directory / key
+        try:
+            meta = json.loads((entry / META_FILE).read_text(encoding="utf-8"))
+            os.utime(entry)
+            mtime = entry.stat().st_mtime
+        except OSError:
+            # Záznam zmizol z disku mimo služby (alebo ho práve vyhodilo _evict)
+            with self._lock:
+                self._sizes.pop(key, None)
+            return None
+        with self._lock:
+            if key in self._sizes:
+                self._sizes[key] = (self._sizes[key][0], mtime)
+        return entry, meta
+
+    def staging_dir(self) -> Path:
+        """Dočasný adresár pre nový záznam (na rovnakom disku kvôli atomickému rename)"""
+        return Path(tempfile.mkdtemp(prefix=".staging_", dir=self.directory))
+
+    def put(self, key: str, staging: Path, meta: Dict[str, Any]) -> Path:
+        (staging / META_FILE).write_text(json.dumps(meta), encoding="utf-8")
+        entry = self.directory / key
+        try:
+            staging.rename(entry)
+        except OSError:
+            # Rovnaký PDF sa medzitým vyrenderoval v inej požiadavke
+            shutil.rmtree(staging, ignore_errors=True)
+            if not (entry / META_FILE).exists():
+                raise
+        size, mtime = directory_size(entry), entry.stat().st_mtime
+        with self._lock:
+            self._sizes[key] = (size, mtime)
+        self._evict(keep=key)
+        return entry
+
+    def discard(self, staging: Path) -> None:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        # Obete sa vyberú pod zámkou, mažú sa až mimo nej
+        victims = []
+        with self._lock:
+            total = sum(size for size, _ in self._sizes.values())
+            for key, (size, _) in sorted(self._sizes.items(), key=lambda item: item[1][1]):
+                if total <= self.max_bytes:
+                    break
+                if key == keep:
+                    continue
+                del self._sizes[key]
+                victims.append(key)
+                total -= size
+                self.evictions += 1
+        for key in victims:
+            shutil.rmtree(self.directory / key, ignore_errors=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total = len(self._sizes), sum(size for size, _ in self._sizes.values())
+        return {
+            "path": str(self.directory),
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
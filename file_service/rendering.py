@@ -0,0 +1,284 @@
+"""CPU-bound PDF rendering.
+
+Everything here runs inside the worker processes of `workers.RenderPool`, so
+the functions are plain synchronous top-level functions that take and return
+picklable values only (paths, str, dicts, RenderProfile). Rendered images are
+written into an output directory (a render cache entry) and the functions
+return the metadata describing them.
+
+Pages are never held in memory all at once: pdftoppm writes them one by one
+into a temporary directory and they are read back one at a time. The stitched
+image is assembled in a file on disk and encoded from a memory map of it, so
+the process itself holds about one decoded page regardless of the page count.
+"""
+import os
+import mmap
+import shutil
+import tempfile
+from dataclasses import dataclass, asdict, replace
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+from pdf2image import convert_from_path, pdfinfo_from_path # type: ignore
+from PIL import Image
+
+# Zvýš, keď sa pre rovnaký PDF a parametre zmení výstup (zneplatní render cache)
+RENDERER_VERSION = 2
+
+ColorMode = Literal["color", "gray", "bilevel"]
+OutputFormat = Literal["jpeg", "webp", "png"]
+
+# Názov formátu v Pillow, prípona súboru, media type a najdlhšia strana, ktorú kodek uloží
+FORMATS: Dict[str, Tuple[str, str, str, int]] = {
+    "jpeg": ("JPEG", "jpg", "image/jpeg", 65500),
+    "webp": ("WEBP", "webp", "image/webp", 16383),
+    "png": ("PNG", "png", "image/png", 2 ** 31 - 1),
+}
+
+# Prah pre čiernobiely výstup; skeny majú svetlosivý papier, preto trochu nad stredom
+BILEVEL_THRESHOLD = 160
+
+# Susedné dlaždice stránky sa prekrývajú o tento podiel, aby žiadny riadok textu nebol rozrezaný v oboch
+TILE_OVERLAP = 0.02
+
+
+class RenderError(ValueError):
+    """Požadovaný výstup sa s týmito parametrami nedá vytvoriť"""
+
+
+@dataclass(frozen=True)
+class RenderProfile:
+    name: str
+    dpi: int
+    color: ColorMode
+    # Najdlhšia strana jednej stránky v pixeloch, väčšie stránky sa zmenšia (None = ponechať)
+    max_edge: Optional[int]
+    format: OutputFormat
+    # Kvalita JPEG/WebP, pri PNG sa ignoruje
+    quality: int
+
+    def with_overrides(self, **overrides: Any) -> "RenderProfile":
+        return replace(self, **{k: v for k, v in overrides.items() if v is not None})
+
+    def params(self) -> Dict[str, Any]:
+        """Všetko, čo ovplyvňuje výstup; meno profilu nie (rovnaké nastavenia zdieľajú cache)"""
+        params = asdict(self)
+        del params["name"]
+        return params
+
+    @property
+    def media_type(self) -> str:
+        return FORMATS[self.format][2]
+
+
+PROFILES: Dict[str, RenderProfile] = {
+    # Pre vision model: ten si obrázok aj tak zmenší, farba ani vysoké DPI nepomáhajú
+    "invoice": RenderProfile("invoice", dpi=150, color="gray", max_edge=1600, format="jpeg", quality=80),
+    # Pôvodné správanie služby
+    "original": RenderProfile("original", dpi=200, color="color", max_edge=None, format="jpeg", quality=95),
+    # Malý náhľad
+    "preview": RenderProfile("preview", dpi=72, color="color", max_edge=800, format="webp", quality=70),
+    # Ostrý čiernobiely text pre OCR
+    "ocr": RenderProfile("ocr", dpi=300, color="bilevel", max_edge=None, format="png", quality=100),
+}
+DEFAULT_PROFILE = "invoice"
+
+
+def render_params(mode: str, profile: RenderProfile) -> Dict[str, Any]:
+    """Kľúčové parametre renderovania pre cache"""
+    return {"renderer": RENDERER_VERSION, "mode": mode, **profile.params()}
+
+
+def page_params(profile: RenderProfile, page: int, rows: int, cols: int, tile: int) -> Dict[str, Any]:
+    """Kľúčové parametre jednej stránky (alebo jej dlaždice) pre cache"""
+    return {"renderer": RENDERER_VERSION, "mode": "page", "page": page, "rows": rows, "cols": cols, "tile": tile, **profile.params()}
+
+
+def render_page_files(pdf_path: str, workdir: str, profile: RenderProfile, page: Optional[int] = None) -> List[str]:
+    """Vyrenderuje stránky PDF (alebo iba jednu) do súborov (jedna po druhej, nič sa nenačíta do pamäte)"""
+    paths: List[str] = convert_from_path(
+        pdf_path,
+        output_folder=workdir,
+        fmt="ppm",
+        paths_only=True,
+        dpi=profile.dpi,
+        grayscale=profile.color != "color",
+        first_page=page,
+        last_page=page,
+    )
+    if not paths:
+        raise ValueError("Could not convert PDF to image")
+    return sorted(paths)
+
+
+def fit_size(size: Tuple[int, int], max_edge: Optional[int]) -> Tuple[int, int]:
+    width, height = size
+    if not max_edge or max(width, height) <= max_edge:
+        return size
+    scale = max_edge / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def page_sizes(paths: List[str], profile: RenderProfile) -> List[Tuple[int, int]]:
+    """Výsledné rozmery stránok z hlavičiek súborov, bez dekódovania pixelov"""
+    sizes = []
+    for path in paths:
+        with Image.open(path) as page:
+            sizes.append(fit_size(page.size, profile.max_edge))
+    return sizes
+
+
+def prepare_page(page: Image.Image, size: Tuple[int, int], profile: RenderProfile) -> Image.Image:
+    """Zmenšenie a farebný režim jednej stránky; výsledok je RGB alebo L"""
+    if page.size != size:
+        page = page.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+    if profile.color == "color":
+        return page.convert("RGB")
+    page = page.convert("L")
+    if profile.color == "bilevel":
+        page = page.point(lambda value: 255 if value > BILEVEL_THRESHOLD else 0)
+    return page
+
+
+def save_image(image: Image.Image, output_path: str, profile: RenderProfile) -> None:
+    pil_format = FORMATS[profile.format][0]
+    if profile.format == "png":
+        if profile.color == "bilevel" and image.mode == "L":
+            # 1 bit na pixel
+            image = image.convert("1", dither=Image.Dither.NONE)
+        image.save(output_path, format=pil_format, compress_level=6)
+    else:
+        image.save(output_path, format=pil_format, quality=profile.quality)
+
+
+def check_dimensions(width: int, height: int, profile: RenderProfile) -> None:
+    limit = FORMATS[profile.format][3]
+    if max(width, height) > limit:
+        raise RenderError(
+            f"Image would be {width}x{height} px, but {profile.format} allows at most {limit} px per side; "
+            f"use mode=pages, a lower dpi/max_edge or another format"
+        )
+
+
+def stitch_pages(paths: List[str], workdir: str, output_path: str, profile: RenderProfile) -> Tuple[int, int]:
+    """Spoj stránky pod seba do jedného obrázka (vertikálne)"""
+    sizes = page_sizes(paths, profile)
+    width = max(w for w, _ in sizes)
+    height = sum(h for _, h in sizes)
+    check_dimensions(width, height, profile)
+
+    # RGBX a L sa dajú namapovať z pamäte bez kópie
+    canvas_mode = "RGBX" if profile.color == "color" else "L"
+    pixel_bytes = len(canvas_mode)
+    white = b"\xff" * pixel_bytes
+
+    # Plátno je súbor na disku, nie obrázok alokovaný v pamäti
+    canvas_path = os.path.join(workdir, "canvas.raw")
+    with open(canvas_path, "w+b") as canvas_file:
+        for path, (page_width, page_height) in zip(paths, sizes):
+            with Image.open(path) as page:
+                pixels = prepare_page(page, (page_width, page_height), profile).convert(canvas_mode).tobytes()
+            os.remove(path)
+
+            if page_width == width:
+                canvas_file.write(pixels)
+            else:
+                page_row = page_width * pixel_bytes
+                padding = white * (width - page_width)
+                for row in range(page_height):
+                    canvas_file.write(pixels[row * page_row:(row + 1) * page_row])
+                    canvas_file.write(padding)
+            del pixels
+        canvas_file.flush()
+
+        # frombuffer mapuje plátno bez kópie, encoder ho číta po riadkoch
+        with mmap.mmap(canvas_file.fileno(), 0, access=mmap.ACCESS_READ) as canvas:
+            combined = Image.frombuffer(canvas_mode, (width, height), canvas, "raw", canvas_mode, 0, 1)
+            try:
+                if profile.format == "png" and canvas_mode == "RGBX":
+                    # PNG nepozná RGBX, tu sa celé plátno skopíruje
+                    save_image(combined.convert("RGB"), output_path, profile)
+                else:
+                    save_image(combined, output_path, profile)
+            finally:
+                # Uvoľni odkaz na mmap, inak ho nie je možné zatvoriť
+                combined.close()
+                del combined
+    return width, height
+
+
+def render_pdf_stitched(pdf_path: str, output_dir: str, profile: RenderProfile) -> Dict[str, Any]:
+    """Skonvertuje PDF na jeden obrázok (všetky stránky pod sebou) do output_dir"""
+    name = f"image.{FORMATS[profile.format][1]}"
+    with tempfile.TemporaryDirectory(prefix="render_") as workdir:
+        paths = render_page_files(pdf_path, workdir, profile)
+        width, height = stitch_pages(paths, workdir, os.path.join(output_dir, name), profile)
+    return {
+        "file": name,
+        "width": width,
+        "height": height,
+        "page_count": len(paths),
+        "format": profile.format
+    }
+
+
+def render_pdf_pages(pdf_path: str, output_dir: str, profile: RenderProfile) -> Dict[str, Any]:
+    """Skonvertuje každú stránku PDF na samostatný obrázok do output_dir"""
+    extension = FORMATS[profile.format][1]
+    pages: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="render_") as workdir:
+        paths = render_page_files(pdf_path, workdir, profile)
+        for number, (path, size) in enumerate(zip(paths, page_sizes(paths, profile)), start=1):
+            name = f"page-{number:04d}.{extension}"
+            with Image.open(path) as page:
+                save_image(prepare_page(page, size, profile), os.path.join(output_dir, name), profile)
+            os.remove(path)
+            pages.append({"page": number, "file": name, "width": size[0], "height": size[1]})
+    return {"pages": pages, "page_count": len(pages), "format": profile.format}
+
+
+def store_document(pdf_path: str, output_dir: str) -> Dict[str, Any]:
+    """Uloží PDF do output_dir (záznam cache), aby sa z neho dali neskôr renderovať jednotlivé stránky"""
+    target = os.path.join(output_dir, "document.pdf")
+    try:
+        os.link(pdf_path, target)
+    except OSError:
+        shutil.copyfile(pdf_path, target)
+    page_count = int(pdfinfo_from_path(pdf_path)["Pages"])
+    return {"content": "document", "file": "document.pdf", "page_count": page_count}
+
+
+def tile_box(size: Tuple[int, int], rows: int, cols: int, tile: int) -> Tuple[int, int, int, int]:
+    """Výrez dlaždice `tile` (po riadkoch) z mriežky rows x cols, s prekryvom TILE_OVERLAP"""
+    width, height = size
+    row, col = divmod(tile, cols)
+    overlap_x = round(width * TILE_OVERLAP) if cols > 1 else 0
+    overlap_y = round(height * TILE_OVERLAP) if rows > 1 else 0
+    left = max(0, width * col // cols - overlap_x)
+    right = min(width, width * (col + 1) // cols + overlap_x)
+    top = max(0, height * row // rows - overlap_y)
+    bottom = min(height, height * (row + 1) // rows + overlap_y)
+    return left, top, right, bottom
+
+
+def render_pdf_page(pdf_path: str, output_dir: str, profile: RenderProfile, page: int, rows: int, cols: int, tile: int) -> Dict[str, Any]:
+    """Vyrenderuje jednu stránku PDF, prípadne iba jej dlaždicu, do output_dir.
+
+    Dlaždica sa vyreže z plného rozlíšenia a max_edge sa uplatní až na ňu, takže má viac detailov ako celá stránka."""
+    name = f"image.{FORMATS[profile.format][1]}"
+    with tempfile.TemporaryDirectory(prefix="render_") as workdir:
+        paths = render_page_files(pdf_path, workdir, profile, page)
+        with Image.open(paths[0]) as image:
+            part = image.crop(tile_box(image.size, rows, cols, tile)) if rows * cols > 1 else image
+            size = fit_size(part.size, profile.max_edge)
+            check_dimensions(*size, profile)
+            save_image(prepare_page(part, size, profile), os.path.join(output_dir, name), profile)
+    return {
+        "file": name,
+        "width": size[0],
+        "height": size[1],
+        "page": page,
+        "rows": rows,
+        "cols": cols,
+        "tile": tile,
+        "format": profile.format
+    }
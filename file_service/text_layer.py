@@ -0,0 +1,98 @@
+"""Text-layer extraction with poppler's pdftotext.
+
+Born-digital PDFs carry their text, so reading it is far cheaper than
+rasterizing the pages and sending a picture to a vision model. Like
+`rendering`, the functions run inside the render pool's worker processes.
+"""
+import os
+import json
+import subprocess
+import xml.etree.ElementTree as ElementTree
+from typing import Any, Dict, List
+
+# Bump when the extracted output changes (invalidates the render cache)
+TEXT_EXTRACTOR_VERSION = 1
+
+# A page counts as having a text layer with at least this many non-space characters
+TEXT_MIN_CHARS_PER_PAGE = int(os.getenv("TEXT_MIN_CHARS_PER_PAGE", "20"))
+PDFTOTEXT_TIMEOUT = float(os.getenv("PDFTOTEXT_TIMEOUT", "60"))
+
+XHTML = "{http://www.w3.org/1999/xhtml}"
+
+
+def text_params(boxes: bool) -> Dict[str, Any]:
+    """Kľúčové parametre extrakcie textu pre render cache"""
+    return {
+        "extractor": TEXT_EXTRACTOR_VERSION,
+        "kind": "text",
+        "boxes": boxes,
+        "min_chars": TEXT_MIN_CHARS_PER_PAGE
+    }
+
+
+def run_pdftotext(pdf_path: str, *options: str) -> str:
+    completed = subprocess.run(
+        ["pdftotext", *options, "-enc", "UTF-8", pdf_path, "-"],
+        capture_output=True,
+        timeout=PDFTOTEXT_TIMEOUT,
+    )
+    if completed.returncode != 0:
+        raise ValueError(f"pdftotext failed: {completed.stderr.decode('utf-8', 'replace').strip()}")
+    return completed.stdout.decode("utf-8", "replace")
+
+
+def box(element: ElementTree.Element) -> List[float]:
+    return [round(float(element.get(name, "0")), 2) for name in ("xMin", "yMin", "xMax", "yMax")]
+
+
+def pages_with_boxes(pdf_path: str) -> List[Dict[str, Any]]:
+    """Text po stránkach s riadkami a ich súradnicami (body PDF, počiatok vľavo hore)"""
+    document = ElementTree.fromstring(run_pdftotext(pdf_path, "-bbox-layout"))
+    pages = []
+    for number, page in enumerate(document.iter(f"{XHTML}page"), start=1):
+        lines = []
+        for line in page.iter(f"{XHTML}line"):
+            text = " ".join(word.text or "" for word in line.iter(f"{XHTML}word"))
+            if text.strip():
+                lines.append({"text": text, "bbox": box(line)})
+        pages.append({
+            "page": number,
+            "width": round(float(page.get("width", "0")), 2),
+            "height": round(float(page.get("height", "0")), 2),
+            "text": "\n".join(line["text"] for line in lines),
+            "lines": lines
+        })
+    return pages
+
+
+def pages_plain(pdf_path: str) -> List[Dict[str, Any]]:
+    """Text po stránkach so zachovaným rozložením (-layout); pdftotext ukončí každú stránku znakom \\f"""
+    text = run_pdftotext(pdf_path, "-layout").replace("\r\n", "\n")
+    return [
+        {"page": number, "text": page.rstrip()}
+        for number, page in enumerate(text.split("\f")[:-1], start=1)
+    ]
+
+
+def extract_text_layer(pdf_path: str, boxes: bool) -> Dict[str, Any]:
+    """Vytiahne textovú vrstvu PDF; has_text je False, ak niektorá stránka text nemá (sken)"""
+    pages = pages_with_boxes(pdf_path) if boxes else pages_plain(pdf_path)
+    chars = [len("".join(page["text"].split())) for page in pages]
+    has_text = bool(pages) and min(chars) >= TEXT_MIN_CHARS_PER_PAGE
+    return {
+        "has_text": has_text,
+        "page_count": len(pages),
+        "chars": sum(chars),
+        "pages": pages if has_text else []
+    }
+
+
+def extract_text_layer_to(pdf_path: str, output_dir: str, boxes: bool) -> Dict[str, Any]:
+    """Ako extract_text_layer, ale text zapíše do output_dir (záznam render cache) a vráti meta"""
+    extracted = extract_text_layer(pdf_path, boxes)
+    meta = {key: extracted[key] for key in ("has_text", "page_count", "chars")}
+    if extracted["has_text"]:
+        with open(os.path.join(output_dir, "text.json"), "w", encoding="utf-8") as output:
+            json.dump(extracted["pages"], output, ensure_ascii=False)
+        meta["file"] = "text.json"
+    return {"content": "text", **meta}
@@ -0,0 +1,115 @@
+"""Streaming PDF uploads into the inbox.
+
+The request body is written to a hidden temporary file in the inbox in
+chunks while its SHA-256 is computed, so memory use does not depend on the
+file size. Content hashes of uploaded and processed PDFs are kept in a
+`HashRegistry` (one marker file per hash), which is how duplicates are
+rejected without hashing the whole inbox.
+"""
+import os
+import json
+import time
+import uuid
+import hashlib
+import asyncio
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+# Kusy tela požiadavky sa zbierajú do tejto veľkosti a až potom zapíšu na disk (v threade)
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+UPLOAD_PREFIX = ".upload_"
+PDF_MAGIC = b"%PDF-"
+
+
+class UploadTooLarge(ValueError):
+    """The body is larger than the configured maximum."""
+
+
+class NotAPdf(ValueError):
+    """The body does not start with the PDF header."""
+
+
+class HashRegistry:
+    """Which PDF content (SHA-256) the inbox has already received.
+
+    A marker `<sha256>.json` is created with O_EXCL, so two concurrent
+    uploads of the same content cannot both win.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.duplicates = 0
+
+    def _path(self, sha256: str) -> Path:
+        return self.directory / f"{sha256}.json"
+
+    def lookup(self, sha256: str) -> Optional[str]:
+        try:
+            return json.loads(self._path(sha256).read_text(encoding="utf-8"))["name"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def reserve(self, sha256: str, name: str) -> Optional[str]:
+        """Zaregistruje obsah pod menom; ak už existuje, vráti meno pôvodného súboru"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        try:
+            fd = os.open(self._path(sha256), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            self.duplicates += 1
+            return self.lookup(sha256) or "?"
+        with os.fdopen(fd, "w", encoding="utf-8") as marker:
+            json.dump({"name": name, "registered": time.time()}, marker)
+        return None
+
+    def register(self, sha256: str, name: str) -> None:
+        """Ako reserve, ale existujúci záznam nechá tak (spracované PDF z bind mountu)"""
+        if not self._path(sha256).exists():
+            self.reserve(sha256, name)
+
+    def release(self, sha256: str) -> None:
+        self._path(sha256).unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": str(self.directory), "duplicates_rejected": self.duplicates}
+
+
+def write_chunk(file, digest, chunk: bytes) -> None:
+    file.write(chunk)
+    digest.update(chunk)
+
+
+async def receive_upload(stream: AsyncIterator[bytes], directory: Path, max_bytes: int) -> Tuple[Path, str, int]:
+    """Zapíše telo požiadavky do dočasného súboru v directory: (cesta, sha256, veľkosť).
+
+    Pri chybe alebo odpojení klienta dočasný súbor zmaže."""
+    temporary = directory / f"{UPLOAD_PREFIX}{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+    buffer = bytearray()
+    checked = False
+    file = await asyncio.to_thread(open, temporary, "wb")
+    try:
+        async for chunk in stream:
+            buffer += chunk
+            # Začiatok súboru je v buffri, kým sa prvýkrát nezapíše (to je až po UPLOAD_CHUNK_BYTES)
+            if not checked and len(buffer) >= len(PDF_MAGIC):
+                if not buffer.startswith(PDF_MAGIC):
+                    raise NotAPdf("Body is not a PDF (missing %PDF- header)")
+                checked = True
+            if size + len(buffer) > max_bytes:
+                raise UploadTooLarge(f"Upload is larger than {max_bytes} bytes")
+            if len(buffer) >= UPLOAD_CHUNK_BYTES:
+                await asyncio.to_thread(write_chunk, file, digest, bytes(buffer))
+                size += len(buffer)
+                buffer.clear()
+        if not checked:
+            raise NotAPdf("Body is not a PDF (missing %PDF- header)")
+        if buffer:
+            await asyncio.to_thread(write_chunk, file, digest, bytes(buffer))
+            size += len(buffer)
+        await asyncio.to_thread(file.close)
+    except BaseException:
+        file.close()
+        temporary.unlink(missing_ok=True)
+        raise
+    return temporary, digest.hexdigest(), size
@@ -0,0 +1,88 @@
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Number of worker processes doing the rasterization (defaults to all cores)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+# How many conversions may run at once; the rest wait in the queue
+PDF_MAX_CONCURRENCY = int(os.getenv("PDF_MAX_CONCURRENCY", str(PDF_WORKERS)))
+# Requests waiting beyond this are rejected instead of piling up (0 = unlimited)
+PDF_MAX_QUEUE = int(os.getenv("PDF_MAX_QUEUE", "32"))
+
+
+class QueueFull(Exception):
+    pass
+
+
+class RenderPool:
+    """Runs CPU-heavy calls in worker processes, off the event loop.
+
+    A semaphore caps the number of conversions in flight; callers beyond the
+    cap wait in an asyncio queue whose depth is reported by `stats()`.
+    """
+
+    def __init__(self, workers: int, max_concurrency: int, max_queue: int) -> None:
+        self.workers = max(1, workers)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max_queue
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        # spawn: forking a process that already runs an event loop and threads is unsafe
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    async def run(self, function: Callable[..., T], *args: Any) -> T:
+        if self.executor is None:
+            raise RuntimeError("Render pool is not started")
+        if self.max_queue and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise QueueFull(f"{self.queued} conversions already queued")
+
+        self.queued += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, function, *args)
+            self.completed += 1
+            return result
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            self.semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "queue_depth": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected
+        }
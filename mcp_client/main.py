@@ -1,7 +1,6 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import time
-import re
 import requests
 import json
 from config_loader import config
@@ -19,82 +18,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def extract_base64_images(text: str) -> tuple[str, list[dict]]:
-    """Extract base64 images from text and return cleaned text + image data"""
-    images = []
-    cleaned_text = text
-    
-    # Pattern for our MCP format: IMAGE_BASE64:format:base64data
-    mcp_pattern = r'IMAGE_BASE64:(\w+):([A-Za-z0-9+/]+={0,2})'
-    mcp_matches = re.findall(mcp_pattern, text)
-    
-    for format_type, base64_data in mcp_matches:
-        if len(base64_data) > 100:  # Validate minimum length
-            images.append({
-                "format": format_type.lower(),
-                "data": base64_data
-            })
-            # Remove the MCP format from text
-            pattern_to_remove = f"IMAGE_BASE64:{format_type}:{base64_data}"
-            cleaned_text = cleaned_text.replace(pattern_to_remove, "[IMAGE PROCESSED]")
-            logger.info(f"📸 Found MCP image: {format_type}, size: {len(base64_data)} chars")
-    
-    # Fallback: Look for other base64 patterns
-    if not images:
-        base64_patterns = [
-            r'data:image\/([^;]+);base64,([A-Za-z0-9+/]{100,}={0,2})',  # Standard data URL
-            r'🔗 Base64 obrázok[^:]*:\s*([A-Za-z0-9+/]{1000,}={0,2})',  # Old MCP format
-            r'([A-Za-z0-9+/]{2000,}={0,2})'  # Raw base64 (very long strings)
-        ]
-        
-        for pattern in base64_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            
-            for match in matches:
-                if isinstance(match, tuple):
-                    # Standard data URL: (format, base64)
-                    format_type, base64_data = match
-                else:
-                    # Raw base64
-                    format_type = "jpeg"  # Default
-                    base64_data = match
-                
-                # Validate it looks like image data
-                if len(base64_data) > 1000:
-                    # Check for common image format headers in base64
-                    if (base64_data.startswith('/9j/') or  # JPEG
-                        base64_data.startswith('iVBOR') or  # PNG
-                        base64_data.startswith('R0lGOD') or  # GIF
-                        base64_data.startswith('UklGR')):   # WebP
-                        
-                        images.append({
-                            "format": format_type,
-                            "data": base64_data
-                        })
-                        # Remove from text
-                        cleaned_text = re.sub(re.escape(base64_data), '[IMAGE PROCESSED]', cleaned_text)
-                        logger.info(f"📸 Found fallback image: {format_type}, size: {len(base64_data)} chars")
-    
-    logger.info(f"📸 Total images extracted: {len(images)}")
-    return cleaned_text, images
-
 def create_image_message_content(text: str, images: list[dict]) -> list[dict]:
     """Create OpenAI message content with text and images"""
     content = [{"type": "text", "text": text}]
     
     for image in images:
-        image_format = image["format"]
+        mime_type = image["mime_type"]
         base64_data = image["data"]
         
-        # Map format to MIME type
-        mime_type = {
-            "jpeg": "image/jpeg",
-            "jpg": "image/jpeg", 
-            "png": "image/png",
-            "gif": "image/gif",
-            "webp": "image/webp"
-        }.get(image_format, "image/jpeg")
-        
         content.append({
             "type": "image_url",
             "image_url": {
@@ -159,8 +90,8 @@ class MCPClient:
             logger.error(f"❌ MCP connection error: {e}")
             return []
     
-    async def call_tool(self, tool_name: str, arguments: dict):
-        """Call MCP tool"""
+    async def call_tool(self, tool_name: str, arguments: dict) -> tuple[str, list[dict]]:
+        """Call MCP tool; returns the text parts and the images (MCP ImageContent) of the result"""
         try:
             mcp_request = {
                 "jsonrpc": "2.0", 
@@ -180,26 +111,35 @@ class MCPClient:
             logger.debug(f"🔧 MCP tool call response status: {response.status_code}")
             if response.status_code == 200:
                 data = response.json()
-                logger.debug(f"🔧 MCP tool call response: {json.dumps(data, indent=2)}")
                 result = data.get("result", {})
                 content = result.get("content", [])
                 
-                # Extract text from content and combine all parts
-                text_result = ""
+                # Obsah podľa typu: text pre model, obrázky idú ďalej bez úprav (base64 z MCP)
+                texts = []
+                images = []
                 for item in content:
-                    if item.get("type") == "text":
-                        text_result += item.get("text", "") + "\n"
+                    item_type = item.get("type")
+                    if item_type == "text":
+                        texts.append(item.get("text", ""))
+                    elif item_type == "image":
+                        images.append({"mime_type": item.get("mimeType", "image/jpeg"), "data": item.get("data", "")})
+                    elif item_type == "resource" and item.get("resource", {}).get("mimeType", "").startswith("image/") and "blob" in item["resource"]:
+                        images.append({"mime_type": item["resource"]["mimeType"], "data": item["resource"]["blob"]})
+                    elif item_type == "resource_link":
+                        texts.append(f"🔗 {item.get('name', '')}: {item.get('uri', '')}")
+                text_result = "\n".join(texts)
                 
-                logger.info(f"✅ MCP tool {tool_name} result length: {len(text_result)} chars")
+                logger.info(f"✅ MCP tool {tool_name} result: {len(text_result)} chars of text, {len(images)} images "
+                            f"({sum(len(image['data']) for image in images):,} base64 chars)")
                 logger.debug(f"✅ MCP tool {tool_name} result preview: {text_result[:200]}...")
-                return text_result.strip()
+                return text_result.strip(), images
             else:
                 logger.error(f"❌ MCP tool call failed: HTTP {response.status_code}")
-                return f"Tool error: HTTP {response.status_code}"
+                return f"Tool error: HTTP {response.status_code}", []
                 
         except Exception as e:
             logger.error(f"❌ MCP tool call failed: {str(e)}")
-            return f"Tool call failed: {str(e)}"
+            return f"Tool call failed: {str(e)}", []
 
 # Global MCP client
 mcp_client = MCPClient()
@@ -433,31 +373,20 @@ async def chat_endpoint(request: ChatRequest):
                     tools_used.append(tool_name)
                     
                     # Call MCP tool
-                    tool_result = await mcp_client.call_tool(tool_name, tool_args)
-                    
-                    # Check for base64 images in tool result
-                    cleaned_result, images = extract_base64_images(tool_result)
+                    tool_result, images = await mcp_client.call_tool(tool_name, tool_args)
                     
                     if images:
                         logger.info(f"📸 Tool {tool_name} returned {len(images)} images")
                         has_images = True
                         all_images.extend(images)
-                        
-                        # Add cleaned tool result
-                        tool_message = {
-                            "role": "tool",
-                            "tool_call_id": tool_call["id"],
-                            "content": cleaned_result
-                        }
-                        messages.append(tool_message)
-                    else:
-                        # Regular tool result without images
-                        tool_message = {
-                            "role": "tool",
-                            "tool_call_id": tool_call["id"],
-                            "content": tool_result
-                        }
-                        messages.append(tool_message)
+                    
+                    # Text výsledku nástroja; obrázky sa pridajú do správy nižšie
+                    tool_message = {
+                        "role": "tool",
+                        "tool_call_id": tool_call["id"],
+                        "content": tool_result
+                    }
+                    messages.append(tool_message)
                 
                 # If we have images, add them to the conversation
                 if has_images:
@@ -18,6 +18,8 @@ from starlette.types import Receive, Scope, Send
 
 # Moje importy
 from tools import get_all_tools, execute_tool
+from tools.http_client import clients
+from tools.result_cache import tool_cache
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -27,7 +29,9 @@ async def health_check(request: Request):
         "status": "healthy",
         "service": "mcp server",
         "version": "0.1.0",
-        "method": request.method
+        "method": request.method,
+        "http_clients": clients.stats(),
+        "tool_cache": tool_cache.stats()
     })
 
 def serve():
@@ -68,12 +72,17 @@ def serve():
     @contextlib.asynccontextmanager
     async def lifespan(app: Starlette) -> AsyncIterator[None]:
         """Context manager for managing session manager lifecycle."""
-        async with session_manager.run():
-            logging.info("Application started with StreamableHTTP session manager!")
-            try:
-                yield
-            finally:
-                logging.info("Application shutting down...")
+        # Zdieľané HTTP spojenia na database_service a file_service pre všetky nástroje
+        await clients.start()
+        try:
+            async with session_manager.run():
+                logging.info("Application started with StreamableHTTP session manager!")
+                try:
+                    yield
+                finally:
+                    logging.info("Application shutting down...")
+        finally:
+            await clients.close()
 
     starlette_app = Starlette(
         debug=True,
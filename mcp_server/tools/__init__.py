@@ -1,5 +1,7 @@
 import mcp.types as types
-from typing import List, Any, Dict
+from typing import List, Any, Dict, Optional, Set
+
+from .result_cache import tool_cache
 
 # Import všetkých nástrojov s error handling
 try:
@@ -9,6 +11,20 @@ except ImportError as e:
     def get_all_invoices_tool(): return None
     async def execute_get_all_invoices(**args): return []
 
+try:
+    from .search_invoices import search_invoices_tool, execute_search_invoices
+except ImportError as e:
+    print(f"Warning: Could not import search_invoices: {e}")
+    def search_invoices_tool(): return None
+    async def execute_search_invoices(**args): return []
+
+try:
+    from .summarize_invoices import summarize_invoices_tool, execute_summarize_invoices
+except ImportError as e:
+    print(f"Warning: Could not import summarize_invoices: {e}")
+    def summarize_invoices_tool(): return None
+    async def execute_summarize_invoices(**args): return []
+
 try:
     from .create_invoice import create_invoice_tool, execute_create_invoice
 except ImportError as e:
@@ -16,6 +32,13 @@ except ImportError as e:
     def create_invoice_tool(): return None
     async def execute_create_invoice(**args): return []
 
+try:
+    from .create_invoices import create_invoices_tool, execute_create_invoices
+except ImportError as e:
+    print(f"Warning: Could not import create_invoices: {e}")
+    def create_invoices_tool(): return None
+    async def execute_create_invoices(**args): return []
+
 try:
     from .list_files import list_files_tool, execute_list_files
 except ImportError as e:
@@ -41,10 +64,22 @@ def get_all_tools() -> List[types.Tool]:
     if tool:
         tools.append(tool)
         
+    tool = search_invoices_tool()
+    if tool:
+        tools.append(tool)
+        
+    tool = summarize_invoices_tool()
+    if tool:
+        tools.append(tool)
+        
     tool = create_invoice_tool()
     if tool:
         tools.append(tool)
         
+    tool = create_invoices_tool()
+    if tool:
+        tools.append(tool)
+        
     tool = list_files_tool()
     if tool:
         tools.append(tool)
@@ -55,14 +90,43 @@ def get_all_tools() -> List[types.Tool]:
     
     return tools
 
-async def execute_tool(name: str, **arguments) -> List[types.TextContent]:
+_read_only_tools: Optional[Set[str]] = None
+
+def is_read_only(name: str) -> bool:
+    """Nástroj, ktorý podľa svojich annotations iba číta (readOnlyHint); ostatné sa považujú za meniace dáta"""
+    global _read_only_tools
+    if _read_only_tools is None:
+        _read_only_tools = {tool.name for tool in get_all_tools() if tool.annotations and tool.annotations.readOnlyHint}
+    return name in _read_only_tools
+
+async def execute_tool(name: str, **arguments) -> List[types.ContentBlock]:
     """
     Vykoná špecifický nástroj s poskytnutými argumentmi.
+    Výsledky nástrojov, ktoré iba čítajú, sa berú z cache; nástroj, ktorý mení dáta, cache vyprázdni.
     """
+    if not is_read_only(name):
+        with tool_cache.writing():
+            return await run_tool(name, **arguments)
+
+    cached = tool_cache.get(name, arguments)
+    if cached is not None:
+        return cached
+    generation = tool_cache.generation
+    result = await run_tool(name, **arguments)
+    tool_cache.put(name, arguments, result, generation)
+    return result
+
+async def run_tool(name: str, **arguments) -> List[types.ContentBlock]:
     if name == "get_all_invoices":
         return await execute_get_all_invoices(**arguments)
+    elif name == "search_invoices":
+        return await execute_search_invoices(**arguments)
+    elif name == "summarize_invoices":
+        return await execute_summarize_invoices(**arguments)
     elif name == "create_invoice":
         return await execute_create_invoice(**arguments)
+    elif name == "create_invoices":
+        return await execute_create_invoices(**arguments)
     elif name == "list_files":
         return await execute_list_files(**arguments)
     elif name == "process_pdf_file":
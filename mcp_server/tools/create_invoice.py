@@ -3,8 +3,7 @@ import json
 import mcp.types as types
 from typing import List
 
-# URL databázového servisu v Docker sieti
-DATABASE_SERVICE_URL = "http://database_service:9002"
+from .http_client import DATABASE_SERVICE_URL, database_session
 
 def create_invoice_tool() -> types.Tool:
     """
@@ -38,7 +37,8 @@ def create_invoice_tool() -> types.Tool:
                 }
             },
             "required": ["invoice_number", "supplier_name", "amount", "date_created", "due_date"]
-        }
+        },
+        annotations=types.ToolAnnotations(readOnlyHint=False)
     )
 
 async def execute_create_invoice(**arguments) -> List[types.TextContent]:
@@ -65,30 +65,30 @@ async def execute_create_invoice(**arguments) -> List[types.TextContent]:
             "due_date": arguments["due_date"]
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{DATABASE_SERVICE_URL}/invoices",
-                json=invoice_data,
-                headers={"Content-Type": "application/json"}
-            ) as response:
+        session = database_session()
+        async with session.post(
+            f"{DATABASE_SERVICE_URL}/invoices",
+            json=invoice_data,
+            headers={"Content-Type": "application/json"}
+        ) as response:
                 
-                if response.status == 200:
-                    result = await response.json()
-                    success_text = f"✅ Faktúra úspešne vytvorená!\n\n"
-                    success_text += f"ID: {result.get('id', 'N/A')}\n"
-                    success_text += f"Číslo faktúry: {result.get('invoice_number', 'N/A')}\n"
-                    success_text += f"Dodávateľ: {invoice_data['supplier_name']}\n"
-                    success_text += f"Suma: {invoice_data['amount']} €\n"
-                    success_text += f"Dátum vytvorenia: {invoice_data['date_created']}\n"
-                    success_text += f"Dátum splatnosti: {invoice_data['due_date']}\n"
+            if response.status == 200:
+                result = await response.json()
+                success_text = f"✅ Faktúra úspešne vytvorená!\n\n"
+                success_text += f"ID: {result.get('id', 'N/A')}\n"
+                success_text += f"Číslo faktúry: {result.get('invoice_number', 'N/A')}\n"
+                success_text += f"Dodávateľ: {invoice_data['supplier_name']}\n"
+                success_text += f"Suma: {invoice_data['amount']} €\n"
+                success_text += f"Dátum vytvorenia: {invoice_data['date_created']}\n"
+                success_text += f"Dátum splatnosti: {invoice_data['due_date']}\n"
                     
-                    return [types.TextContent(type="text", text=success_text)]
-                else:
-                    error_text = await response.text()
-                    return [types.TextContent(
-                        type="text",
-                        text=f"❌ Chyba pri vytváraní faktúry: HTTP {response.status}\n{error_text}"
-                    )]
+                return [types.TextContent(type="text", text=success_text)]
+            else:
+                error_text = await response.text()
+                return [types.TextContent(
+                    type="text",
+                    text=f"❌ Chyba pri vytváraní faktúry: HTTP {response.status}\n{error_text}"
+                )]
                     
     except ValueError as e:
         return [types.TextContent(
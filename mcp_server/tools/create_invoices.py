@@ -0,0 +1,165 @@
+import aiohttp
+import mcp.types as types
+from datetime import date
+from typing import Any, Dict, List
+
+from .http_client import DATABASE_SERVICE_URL, database_session
+
+# Najviac faktúr v jednom volaní nástroja
+MAX_INVOICES = 500
+REQUIRED_FIELDS = ["invoice_number", "supplier_name", "amount", "date_created", "due_date"]
+
+def create_invoices_tool() -> types.Tool:
+    """
+    Definícia nástroja pre hromadné vytvorenie faktúr.
+    """
+    return types.Tool(
+        name="create_invoices",
+        description=(
+            "Vytvorí viac faktúr naraz jednou požiadavkou (použi namiesto opakovaného create_invoice). "
+            "Všetky faktúry sa najprv skontrolujú; s on_conflict=fail sa pri chybe neuloží žiadna."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "invoices": {
+                    "type": "array",
+                    "minItems": 1,
+                    "maxItems": MAX_INVOICES,
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "invoice_number": {"type": "string", "description": "Číslo faktúry (napr. INV-2024-003)"},
+                            "supplier_name": {"type": "string", "description": "Názov dodávateľa"},
+                            "amount": {"type": "number", "description": "Suma faktúry v eurách"},
+                            "date_created": {"type": "string", "description": "Dátum vytvorenia, YYYY-MM-DD"},
+                            "due_date": {"type": "string", "description": "Dátum splatnosti, YYYY-MM-DD"}
+                        },
+                        "required": REQUIRED_FIELDS
+                    }
+                },
+                "on_conflict": {
+                    "type": "string",
+                    "enum": ["fail", "skip", "update"],
+                    "description": "Čo s číslom faktúry, ktoré už v databáze je: fail = neuloží nič (predvolene), skip = preskočí, update = prepíše"
+                }
+            },
+            "required": ["invoices"]
+        },
+        annotations=types.ToolAnnotations(readOnlyHint=False)
+    )
+
+def validate_invoice(item: Any) -> Dict[str, Any]:
+    """Skontroluje jednu faktúru a vráti dáta pre database_service; pri chybe ValueError"""
+    if not isinstance(item, dict):
+        raise ValueError("faktúra musí byť objekt")
+    missing = [field for field in REQUIRED_FIELDS if item.get(field) in (None, "")]
+    if missing:
+        raise ValueError(f"chýba {', '.join(missing)}")
+    if isinstance(item["amount"], bool):
+        raise ValueError("suma musí byť číslo")
+    try:
+        amount = float(item["amount"])
+    except (TypeError, ValueError):
+        raise ValueError("suma musí byť číslo")
+    for field in ("date_created", "due_date"):
+        try:
+            date.fromisoformat(str(item[field]))
+        except ValueError:
+            raise ValueError(f"{field} nie je dátum vo formáte YYYY-MM-DD")
+    return {
+        "invoice_number": str(item["invoice_number"]),
+        "supplier_name": str(item["supplier_name"]),
+        "amount": amount,
+        "date_created": str(item["date_created"]),
+        "due_date": str(item["due_date"])
+    }
+
+def format_errors(errors: List[Dict[str, Any]]) -> str:
+    return "\n".join(f"  #{e['row'] + 1} {e.get('invoice_number') or '?'}: {e['error']}" for e in errors)
+
+async def execute_create_invoices(**arguments) -> List[types.TextContent]:
+    """
+    Vykoná hromadné vytvorenie faktúr jednou požiadavkou na /invoices/bulk.
+    """
+    try:
+        items = arguments.get("invoices")
+        on_conflict = arguments.get("on_conflict") or "fail"
+        if not isinstance(items, list) or not items:
+            return [types.TextContent(type="text", text="❌ Parameter invoices musí byť neprázdne pole faktúr.")]
+        if len(items) > MAX_INVOICES:
+            return [types.TextContent(type="text", text=f"❌ Naraz je možné vytvoriť najviac {MAX_INVOICES} faktúr, prišlo {len(items)}.")]
+        if on_conflict not in ("fail", "skip", "update"):
+            return [types.TextContent(type="text", text=f"❌ Neznáma hodnota on_conflict '{on_conflict}'.")]
+
+        # Všetko sa skontroluje vopred, aby model dostal všetky chyby naraz
+        invoices = []
+        errors = []
+        seen: Dict[str, int] = {}
+        for row, item in enumerate(items):
+            number = item.get("invoice_number") if isinstance(item, dict) else None
+            try:
+                invoice = validate_invoice(item)
+                if invoice["invoice_number"] in seen:
+                    raise ValueError(f"rovnaké číslo ako faktúra #{seen[invoice['invoice_number']] + 1}")
+            except ValueError as e:
+                errors.append({"row": row, "invoice_number": number, "error": str(e)})
+                continue
+            seen[invoice["invoice_number"]] = row
+            invoices.append(invoice)
+        if errors:
+            return [types.TextContent(
+                type="text",
+                text=f"❌ {len(errors)} z {len(items)} faktúr je neplatných, nič sa neuložilo:\n{format_errors(errors)}"
+            )]
+
+        session = database_session()
+        async with session.post(
+            f"{DATABASE_SERVICE_URL}/invoices/bulk",
+            params={"on_conflict": on_conflict, "details": "true"},
+            json=invoices
+        ) as response:
+            if response.status == 409:
+                detail = (await response.json()).get("detail", {})
+                return [types.TextContent(
+                    type="text",
+                    text=f"❌ Niektoré čísla faktúr už v databáze sú, nič sa neuložilo "
+                         f"(použi on_conflict=skip alebo update):\n{format_errors(detail.get('errors', []))}"
+                )]
+            if response.status == 422:
+                result = await response.json()
+                return [types.TextContent(
+                    type="text",
+                    text=f"❌ Databázový servis odmietol {result.get('failed', 0)} faktúr, nič sa neuložilo:\n{format_errors(result.get('errors', []))}"
+                )]
+            if response.status != 200:
+                error_text = await response.text()
+                return [types.TextContent(
+                    type="text",
+                    text=f"❌ Chyba pri vytváraní faktúr: HTTP {response.status}\n{error_text}"
+                )]
+            result = await response.json()
+
+        lines = [
+            f"✅ Faktúry spracované ({result['received']}): vytvorené {result['inserted']}, "
+            f"aktualizované {result['updated']}, preskočené {result['skipped']}, chybné {result['failed']}"
+        ]
+        for item in result.get("results", []):
+            line = f"  #{item['row'] + 1} {item['invoice_number']}: {item['status']}"
+            if "id" in item:
+                line += f" (ID {item['id']})"
+            if "error" in item:
+                line += f" - {item['error']}"
+            lines.append(line)
+        return [types.TextContent(type="text", text="\n".join(lines))]
+
+    except aiohttp.ClientError as e:
+        return [types.TextContent(
+            type="text",
+            text=f"❌ Chyba pri pripojení k databázovému servisu: {str(e)}"
+        )]
+    except Exception as e:
+        return [types.TextContent(
+            type="text",
+            text=f"❌ Neočakávaná chyba: {str(e)}"
+        )]
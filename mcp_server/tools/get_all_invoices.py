@@ -1,65 +1,201 @@
+import os
+import csv
+import io
 import aiohttp
 import json
+import base64
 import mcp.types as types
-from typing import List
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
 
-# URL databázového servisu v Docker sieti
-DATABASE_SERVICE_URL = "http://database_service:9002"
+from .http_client import DATABASE_SERVICE_URL, database_session
+
+# Posledné naformátované odpovede podľa URL a formátu spolu s ETag-om. Ak sa dáta
+# v databáze nezmenili, servis vráti 304 a použije sa uložený text.
+_formatted_cache: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+_FORMATTED_CACHE_SIZE = 32
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+# Približný strop dĺžky výstupu v tokenoch (odhad: 4 znaky na token)
+INVOICES_TOKEN_BUDGET = int(os.getenv("INVOICES_TOKEN_BUDGET", "3000"))
+CHARS_PER_TOKEN = 4
+
+FILTERS = ["supplier", "date_from", "date_to", "amount_min", "amount_max", "due_from", "due_to"]
+FORMATS = ["table", "csv", "detailed"]
+FORMAT_HEADERS: Dict[str, Optional[str]] = {
+    "table": "id | číslo | dodávateľ | suma € | vytvorená | splatnosť",
+    "csv": "id,invoice_number,supplier_name,amount,date_created,due_date",
+    "detailed": None,
+}
 
 def get_all_invoices_tool() -> types.Tool:
     """
-    Definícia nástroja pre získanie všetkých faktúr.
+    Definícia nástroja pre získanie faktúr.
     """
     return types.Tool(
         name="get_all_invoices",
-        description="Získa všetky faktúry z databázy zoradené podľa dátumu vytvorenia (najnovšie prvé)",
+        description=(
+            "Získa faktúry z databázy zoradené podľa dátumu vytvorenia (najnovšie prvé), po stranách. "
+            "Ak je v odpovedi cursor, ďalšiu stranu získaš zavolaním s týmto cursor a rovnakými filtrami."
+        ),
         inputSchema={
             "type": "object",
-            "properties": {},
+            "properties": {
+                "limit": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "maximum": MAX_LIMIT,
+                    "description": f"Počet faktúr na stranu (predvolene {DEFAULT_LIMIT})"
+                },
+                "cursor": {
+                    "type": "string",
+                    "description": "Pokračovanie z predchádzajúcej strany"
+                },
+                "supplier": {"type": "string", "description": "Dodávateľ (presná zhoda)"},
+                "date_from": {"type": "string", "description": "Vytvorené od, YYYY-MM-DD"},
+                "date_to": {"type": "string", "description": "Vytvorené do, YYYY-MM-DD"},
+                "amount_min": {"type": "number", "description": "Minimálna suma v eurách"},
+                "amount_max": {"type": "number", "description": "Maximálna suma v eurách"},
+                "due_from": {"type": "string", "description": "Splatnosť od, YYYY-MM-DD"},
+                "due_to": {"type": "string", "description": "Splatnosť do, YYYY-MM-DD"},
+                "format": {
+                    "type": "string",
+                    "enum": FORMATS,
+                    "description": "table = kompaktná tabuľka (predvolene), csv, detailed = každá faktúra na viac riadkov"
+                }
+            },
             "required": []
-        }
+        },
+        annotations=types.ToolAnnotations(readOnlyHint=True)
     )
 
+def format_invoices(invoices: List[Dict[str, Any]], output_format: str) -> List[str]:
+    """Jeden textový blok na faktúru (v poradí), hlavička sa pridáva zvlášť"""
+    if output_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="")
+        rows = []
+        for invoice in invoices:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow([invoice["id"], invoice["invoice_number"], invoice["supplier_name"],
+                             invoice["amount"], invoice["date_created"], invoice["due_date"]])
+            rows.append(buffer.getvalue())
+        return rows
+    if output_format == "detailed":
+        return [
+            f"ID: {invoice['id']}\n"
+            f"Číslo faktúry: {invoice['invoice_number']}\n"
+            f"Dodávateľ: {invoice['supplier_name']}\n"
+            f"Suma: {invoice['amount']} €\n"
+            f"Dátum vytvorenia: {invoice['date_created']}\n"
+            f"Dátum splatnosti: {invoice['due_date']}\n"
+            + "-" * 50
+            for invoice in invoices
+        ]
+    return [
+        f"{invoice['id']} | {invoice['invoice_number']} | {invoice['supplier_name']} | "
+        f"{invoice['amount']} | {invoice['date_created']} | {invoice['due_date']}"
+        for invoice in invoices
+    ]
+
+def fit_budget(header: Optional[str], rows: List[str], budget_chars: int) -> int:
+    """Koľko riadkov sa zmestí do rozpočtu (aspoň jeden, aby sa dalo pokračovať)"""
+    used = len(header) + 1 if header else 0
+    for count, row in enumerate(rows):
+        used += len(row) + 1
+        if used > budget_chars and count > 0:
+            return count
+    return len(rows)
+
+def cursor_after(invoice: Dict[str, Any]) -> str:
+    """Cursor pokračujúci za danou faktúrou (rovnaký formát ako encode_cursor v database_service)"""
+    raw = f"{invoice['date_created']}|{invoice['id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
 async def execute_get_all_invoices(**arguments) -> List[types.TextContent]:
     """
-    Vykoná získanie všetkých faktúr z databázového servisu.
+    Vykoná získanie jednej strany faktúr z databázového servisu.
     """
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"{DATABASE_SERVICE_URL}/invoices") as response:
-                if response.status == 200:
-                    invoices = await response.json()
-                    
-                    # Formátovanie výsledku pre lepšiu čitateľnosť
-                    result = f"Získané faktúry (celkom: {len(invoices)}):\n\n"
-                    
-                    for invoice in invoices:
-                        result += f"ID: {invoice['id']}\n"
-                        result += f"Číslo faktúry: {invoice['invoice_number']}\n"
-                        result += f"Dodávateľ: {invoice['supplier_name']}\n"
-                        result += f"Suma: {invoice['amount']} €\n"
-                        result += f"Dátum vytvorenia: {invoice['date_created']}\n"
-                        result += f"Dátum splatnosti: {invoice['due_date']}\n"
-                        result += "-" * 50 + "\n"
-                    
-                    if not invoices:
-                        result = "V databáze nie sú žiadne faktúry."
-                    
-                    return [types.TextContent(type="text", text=result)]
-                else:
-                    error_text = await response.text()
-                    return [types.TextContent(
-                        type="text", 
-                        text=f"Chyba pri získavaní faktúr: HTTP {response.status}\n{error_text}"
-                    )]
-                    
+        output_format = arguments.get("format") or "table"
+        if output_format not in FORMATS:
+            return [types.TextContent(type="text", text=f"Neznámy formát '{output_format}', dostupné: {', '.join(FORMATS)}")]
+        limit = max(1, min(int(arguments.get("limit") or DEFAULT_LIMIT), MAX_LIMIT))
+
+        params: Dict[str, Any] = {"limit": limit}
+        for name in ["cursor", *FILTERS]:
+            if arguments.get(name) not in (None, ""):
+                params[name] = arguments[name]
+
+        url = f"{DATABASE_SERVICE_URL}/invoices?{urlencode(params)}"
+        cache_key = f"{output_format}|{url}"
+        cached = _formatted_cache.get(cache_key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+
+        session = database_session()
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304 and cached:
+                _formatted_cache.move_to_end(cache_key)
+                return [types.TextContent(type="text", text=cached[1])]
+            if response.status != 200:
+                error_text = await response.text()
+                return [types.TextContent(
+                    type="text",
+                    text=f"Chyba pri získavaní faktúr: HTTP {response.status}\n{error_text}"
+                )]
+            page = await response.json()
+            etag = response.headers.get("ETag")
+
+        invoices = page.get("items", [])
+        if not invoices:
+            return [types.TextContent(type="text", text="Žiadne faktúry (pre zadané filtre)." if len(params) > 1 else "V databáze nie sú žiadne faktúry.")]
+
+        header = FORMAT_HEADERS[output_format]
+        rows = format_invoices(invoices, output_format)
+        shown = fit_budget(header, rows, INVOICES_TOKEN_BUDGET * CHARS_PER_TOKEN)
+        next_cursor = page.get("next_cursor")
+        if shown < len(rows):
+            # Rozpočet nestačí na celú stranu: cursor musí pokračovať za poslednou zobrazenou faktúrou
+            next_cursor = cursor_after(invoices[shown - 1])
+
+        lines = [f"Faktúry (zobrazené: {shown}, limit strany: {limit}, najnovšie prvé):"]
+        if header:
+            lines.append(header)
+        lines.extend(rows[:shown])
+        if shown < len(rows):
+            lines.append(f"Výstup bol skrátený na {shown} faktúr, aby sa zmestil do limitu.")
+        if next_cursor:
+            lines.append(
+                f"Ďalšie faktúry: zavolaj get_all_invoices s cursor=\"{next_cursor}\" "
+                f"(a rovnakými filtrami, formátom a limitom)."
+            )
+        else:
+            lines.append("Toto je posledná strana.")
+        result = "\n".join(lines)
+
+        if etag:
+            _formatted_cache[cache_key] = (etag, result)
+            _formatted_cache.move_to_end(cache_key)
+            while len(_formatted_cache) > _FORMATTED_CACHE_SIZE:
+                _formatted_cache.popitem(last=False)
+
+        return [types.TextContent(type="text", text=result)]
+
+    except (TypeError, ValueError) as e:
+        return [types.TextContent(
+            type="text",
+            text=f"Chybný parameter: {str(e)}"
+        )]
     except aiohttp.ClientError as e:
         return [types.TextContent(
-            type="text", 
+            type="text",
             text=f"Chyba pri pripojení k databázovému servisu: {str(e)}"
         )]
     except Exception as e:
         return [types.TextContent(
-            type="text", 
+            type="text",
             text=f"Neočakávaná chyba: {str(e)}"
-        )]
\ No newline at end of file
+        )]
@@ -0,0 +1,124 @@
+import os
+import time
+import aiohttp
+from types import SimpleNamespace
+from typing import Any, Dict
+
+# URL servisov v Docker sieti
+DATABASE_SERVICE_URL = os.getenv("DATABASE_SERVICE_URL", "http://database_service:9002")
+FILE_SERVICE_URL = os.getenv("FILE_SERVICE_URL", "http://file_service:9001")
+
+# Spojenia na jeden servis, čas udržania nečinného spojenia a timeouty
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "20"))
+HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+# Musí byť dlhší ako long-poll nástroja process_pdf_file
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "30"))
+
+SERVICES = {
+    "database": DATABASE_SERVICE_URL,
+    "files": FILE_SERVICE_URL,
+}
+
+
+class ServiceClients:
+    """
+    Jedna aiohttp.ClientSession (a teda pool spojení s keep-alive) pre každý servis,
+    zdieľaná všetkými nástrojmi. Vytvára sa v lifespan mcp servera.
+    """
+
+    def __init__(self):
+        self.sessions: Dict[str, aiohttp.ClientSession] = {}
+        self.metrics: Dict[str, Dict[str, float]] = {}
+
+    def _trace(self, service: str) -> aiohttp.TraceConfig:
+        metrics = self.metrics.setdefault(service, {
+            "requests": 0, "errors": 0, "total_seconds": 0.0,
+            "connections_created": 0, "connections_reused": 0
+        })
+
+        async def on_request_start(session: Any, context: SimpleNamespace, params: Any) -> None:
+            context.started = time.perf_counter()
+
+        async def on_request_end(session: Any, context: SimpleNamespace, params: Any) -> None:
+            metrics["requests"] += 1
+            metrics["total_seconds"] += time.perf_counter() - context.started
+
+        async def on_request_exception(session: Any, context: SimpleNamespace, params: Any) -> None:
+            metrics["errors"] += 1
+
+        async def on_connection_create_end(session: Any, context: SimpleNamespace, params: Any) -> None:
+            metrics["connections_created"] += 1
+
+        async def on_connection_reuseconn(session: Any, context: SimpleNamespace, params: Any) -> None:
+            metrics["connections_reused"] += 1
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace
+
+    def _create(self, service: str) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_LIMIT,
+            keepalive_timeout=HTTP_KEEPALIVE_SECONDS,
+            ttl_dns_cache=300,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT),
+            trace_configs=[self._trace(service)],
+        )
+
+    async def start(self) -> None:
+        for service in SERVICES:
+            self.sessions[service] = self._create(service)
+
+    async def close(self) -> None:
+        sessions, self.sessions = self.sessions, {}
+        for session in sessions.values():
+            await session.close()
+
+    def session(self, service: str) -> aiohttp.ClientSession:
+        """
+        Zdieľaná session pre servis ("database" alebo "files").
+        Mimo lifespan (napr. pri priamom volaní nástroja) sa vytvorí pri prvom použití.
+        """
+        session = self.sessions.get(service)
+        if session is None or session.closed:
+            session = self.sessions[service] = self._create(service)
+        return session
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {}
+        for service, metrics in self.metrics.items():
+            requests = int(metrics["requests"])
+            stats[service] = {
+                "url": SERVICES[service],
+                "requests": requests,
+                "errors": int(metrics["errors"]),
+                "avg_ms": round(metrics["total_seconds"] / requests * 1000, 2) if requests else None,
+                "connections_created": int(metrics["connections_created"]),
+                "connections_reused": int(metrics["connections_reused"]),
+            }
+        return {
+            "pool_limit": HTTP_POOL_LIMIT,
+            "keepalive_seconds": HTTP_KEEPALIVE_SECONDS,
+            "timeout_seconds": HTTP_TIMEOUT_SECONDS,
+            "services": stats,
+        }
+
+
+clients = ServiceClients()
+
+
+def database_session() -> aiohttp.ClientSession:
+    return clients.session("database")
+
+
+def files_session() -> aiohttp.ClientSession:
+    return clients.session("files")
@@ -1,10 +1,13 @@
 import aiohttp
+import base64
 import json
 import mcp.types as types
 from typing import List
 
-# URL file servisu v Docker sieti
-FILE_SERVICE_URL = "http://file_service:9001"
+from .http_client import FILE_SERVICE_URL, files_session
+
+# Ako dlho jedno volanie nástroja čaká na dokončenie úlohy (MCP klient čaká na celé volanie 30 s)
+JOB_WAIT_SECONDS = 20
 
 def process_pdf_file_tool() -> types.Tool:
     """
@@ -12,59 +15,130 @@ def process_pdf_file_tool() -> types.Tool:
     """
     return types.Tool(
         name="process_pdf_file",
-        description="Spracuje prvý dostupný PDF súbor - skonvertuje ho na JPG obrázok a premenuje pôvodný súbor s prefixom 'raw_'",
+        description="Spracuje prvý dostupný PDF súbor - ak má textovú vrstvu, vráti jeho text, inak ho skonvertuje na obrázok; pôvodný súbor premenuje s prefixom 'raw_'",
         inputSchema={
             "type": "object",
-            "properties": {},
+            "properties": {
+                "job_id": {
+                    "type": "string",
+                    "description": "ID úlohy z predchádzajúceho volania, ktorá ešte nebola dokončená"
+                }
+            },
             "required": []
-        }
+        },
+        annotations=types.ToolAnnotations(readOnlyHint=False)
     )
 
-async def execute_process_pdf_file(**arguments) -> List[types.TextContent]:
+async def execute_process_pdf_file(**arguments) -> List[types.ContentBlock]:
     """
     Vykoná spracovanie PDF súboru cez file servis.
+
+    Konverzia beží ako úloha vo fronte file servisu; ak nestihne skončiť, vráti sa job_id
+    a nástroj sa zavolá znova s ním.
     """
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"{FILE_SERVICE_URL}/process-file") as response:
-                if response.status == 200:
-                    result_data = await response.json()
-                    
-                    # Kontrola, či boli nejaké súbory na spracovanie
-                    if result_data.get("message") == "no files to process":
-                        return [types.TextContent(
-                            type="text",
-                            text="📄 Žiadne PDF súbory na spracovanie.\n\nVšetky súbory už boli spracované alebo v zložke nie sú žiadne PDF súbory bez 'raw_' prefixu."
-                        )]
+        session = files_session()
+        job_id = arguments.get("job_id")
+        if not job_id:
+            async with session.post(f"{FILE_SERVICE_URL}/jobs") as response:
+                if response.status != 202:
+                    error_text = await response.text()
+                    return [types.TextContent(
+                        type="text",
+                        text=f"❌ Chyba pri zaradení PDF do spracovania: HTTP {response.status}\n{error_text}"
+                    )]
+                job_id = (await response.json())["id"]
+
+        async with session.get(f"{FILE_SERVICE_URL}/jobs/{job_id}", params={"wait": JOB_WAIT_SECONDS}) as response:
+            if response.status == 200:
+                job = await response.json()
+
+                if job["state"] in ("queued", "running"):
+                    return [types.TextContent(
+                        type="text",
+                        text=f"⏳ PDF sa ešte spracováva (stav: {job['state']}).\n\n"
+                             f"🆔 job_id: {job_id}\n"
+                             f"💡 Zavolaj process_pdf_file znova s týmto job_id a dostaneš výsledok."
+                    )]
+                if job["state"] == "failed":
+                    return [types.TextContent(
+                        type="text",
+                        text=f"❌ Chyba pri spracovaní PDF súboru: {job['error']}"
+                    )]
+
+                result_data = job["result"]
+                image_bytes = b""
+                if result_data.get("image_url"):
+                    # Obrázok sa sťahuje binárne, nie ako base64 v JSON
+                    async with session.get(f"{FILE_SERVICE_URL}{result_data['image_url']}") as image_response:
+                        if image_response.status != 200:
+                            error_text = await image_response.text()
+                            return [types.TextContent(
+                                type="text",
+                                text=f"❌ Chyba pri sťahovaní obrázka: HTTP {image_response.status}\n{error_text}"
+                            )]
+                        image_bytes = await image_response.read()
                     
-                    # Úspešné spracovanie
-                    original_filename = result_data.get("original_filename", "N/A")
-                    raw_filename = result_data.get("raw_filename", "N/A")
-                    base64_data = result_data.get("base64", "")
-                    format_type = result_data.get("format", "jpeg")
+                # Kontrola, či boli nejaké súbory na spracovanie
+                if result_data.get("message") == "no files to process":
+                    return [types.TextContent(
+                        type="text",
+                        text="📄 Žiadne PDF súbory na spracovanie.\n\nVšetky súbory už boli spracované alebo v zložke nie sú žiadne PDF súbory bez 'raw_' prefixu."
+                    )]
                     
-                    success_text = f"✅ PDF súbor úspešne spracovaný!\n\n"
+                # Úspešné spracovanie
+                original_filename = result_data.get("original_filename", "N/A")
+                raw_filename = result_data.get("raw_filename", "N/A")
+
+                # Digitálne PDF: text namiesto obrázka, netreba vision model
+                if result_data.get("content") == "text":
+                    success_text = f"✅ PDF súbor úspešne spracovaný (textová vrstva)!\n\n"
                     success_text += f"📁 Pôvodný súbor: {original_filename}\n"
                     success_text += f"📁 Premenovaný na: {raw_filename}\n"
-                    success_text += f"🖼️ Formát obrázka: {format_type.upper()}\n"
-                    success_text += f"📊 Veľkosť base64 dát: {len(base64_data):,} znakov\n\n"
-                    success_text += f"🖼️ Obrázok je pripravený na zobrazenie alebo analýzu.\n"
-                    success_text += f"💡 Môžete sa opýtať: 'Čo je na obrázku?' alebo 'Analyzuj obsah faktúry'"
-                    
-                    # ŠPECIÁLNY FORMÁT pre base64 obrázok - chatbot toto rozpozná
-                    image_content = f"IMAGE_BASE64:{format_type}:{base64_data}"
-                    
+                    success_text += f"📄 Počet strán: {result_data.get('page_count', 0)}\n\n"
+                    page_texts = [
+                        f"--- Strana {page['page']} ---\n{page['text']}"
+                        for page in result_data.get("pages", [])
+                    ]
                     return [
                         types.TextContent(type="text", text=success_text),
-                        types.TextContent(type="text", text=image_content)
+                        types.TextContent(type="text", text="\n\n".join(page_texts))
                     ]
+
+                base64_data = base64.b64encode(image_bytes).decode('utf-8') if image_bytes else result_data.get("base64", "")
+                format_type = result_data.get("format", "jpeg")
+                media_type = result_data.get("media_type", "image/jpeg")
                     
-                else:
-                    error_text = await response.text()
-                    return [types.TextContent(
-                        type="text",
-                        text=f"❌ Chyba pri spracovaní PDF súboru: HTTP {response.status}\n{error_text}"
-                    )]
+                success_text = f"✅ PDF súbor úspešne spracovaný!\n\n"
+                success_text += f"📁 Pôvodný súbor: {original_filename}\n"
+                success_text += f"📁 Premenovaný na: {raw_filename}\n"
+                success_text += f"🖼️ Formát obrázka: {format_type.upper()}\n"
+                success_text += f"📊 Veľkosť obrázka: {len(image_bytes) or len(base64_data) * 3 // 4:,} bajtov\n\n"
+                success_text += f"🖼️ Obrázok je pripravený na zobrazenie alebo analýzu.\n"
+                success_text += f"💡 Môžete sa opýtať: 'Čo je na obrázku?' alebo 'Analyzuj obsah faktúry'"
+
+                # Obrázok ako typovaný MCP obsah; klient ho nemusí hľadať v texte
+                content: List[types.ContentBlock] = [
+                    types.TextContent(type="text", text=success_text),
+                    types.ImageContent(type="image", data=base64_data, mimeType=media_type)
+                ]
+                if result_data.get("image_url"):
+                    # Odkaz na rovnaký obrázok vo file servise pre klientov, ktoré si ho stiahnu samy
+                    content.append(types.ResourceLink(
+                        type="resource_link",
+                        name=f"{original_filename} ({format_type})",
+                        uri=f"{FILE_SERVICE_URL}{result_data['image_url']}",
+                        mimeType=media_type,
+                        size=len(image_bytes) or None
+                    ))
+                return content
+                    
+            else:
+                error_text = await response.text()
+                return [types.TextContent(
+                    type="text",
+                    text=f"❌ Chyba pri spracovaní PDF súboru: HTTP {response.status}\n{error_text}"
+                )]
                     
     except aiohttp.ClientError as e:
         return [types.TextContent(
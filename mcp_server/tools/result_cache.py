@@ -0,0 +1,95 @@
+import os
+import json
+import time
+import mcp.types as types
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Ako dlho platí výsledok nástroja, ktorý len číta (zmeny mimo MCP servera sa prejavia najneskôr po TTL)
+TOOL_CACHE_TTL_SECONDS = float(os.getenv("TOOL_CACHE_TTL_SECONDS", "30"))
+TOOL_CACHE_MAX_ENTRIES = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "128"))
+
+# Nástroje vracajú chyby ako text; takéto výsledky sa neukladajú
+ERROR_PREFIXES = ("❌", "Chyba", "Chybný", "Neočakávaná chyba")
+
+
+def is_error(result: List[types.ContentBlock]) -> bool:
+    return any(isinstance(item, types.TextContent) and item.text.startswith(ERROR_PREFIXES) for item in result)
+
+
+class ToolResultCache:
+    """
+    TTL + LRU cache výsledkov nástrojov s readOnlyHint.
+    Kľúčom je meno nástroja a jeho argumenty; nástroj, ktorý mení dáta, cache vyprázdni.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, List[types.ContentBlock]]]" = OrderedDict()
+        self.metrics: Dict[str, Dict[str, int]] = {}
+        self.invalidations = 0
+        # Zvyšuje sa pri invalidácii; výsledok čítania, počas ktorého sa dáta zmenili, sa neuloží
+        self.generation = 0
+
+    def _metrics(self, tool: str) -> Dict[str, int]:
+        return self.metrics.setdefault(tool, {"hits": 0, "misses": 0, "expired": 0, "evictions": 0})
+
+    @staticmethod
+    def key(tool: str, arguments: Dict[str, Any]) -> Tuple[str, str]:
+        return tool, json.dumps(arguments, sort_keys=True, default=str)
+
+    def get(self, tool: str, arguments: Dict[str, Any]) -> Optional[List[types.ContentBlock]]:
+        metrics = self._metrics(tool)
+        key = self.key(tool, arguments)
+        entry = self._entries.get(key)
+        if entry is None:
+            metrics["misses"] += 1
+            return None
+        stored, result = entry
+        if time.monotonic() - stored > self.ttl_seconds:
+            del self._entries[key]
+            metrics["expired"] += 1
+            metrics["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        metrics["hits"] += 1
+        return result
+
+    def put(self, tool: str, arguments: Dict[str, Any], result: List[types.ContentBlock], generation: int) -> None:
+        if self.ttl_seconds <= 0 or generation != self.generation or is_error(result):
+            return
+        key = self.key(tool, arguments)
+        self._entries[key] = (time.monotonic(), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            (evicted_tool, _), _ = self._entries.popitem(last=False)
+            self._metrics(evicted_tool)["evictions"] += 1
+
+    def _clear(self) -> None:
+        self._entries.clear()
+        self.generation += 1
+
+    @contextmanager
+    def writing(self) -> Iterator[None]:
+        """Beží nástroj, ktorý mení dáta: cache sa vyprázdni pred ním aj po ňom
+        (čítanie spustené počas zmeny mohlo vidieť staré dáta)"""
+        self._clear()
+        try:
+            yield
+        finally:
+            self._clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "max_entries": self.max_entries,
+            "entries": len(self._entries),
+            "invalidations": self.invalidations,
+            "tools": self.metrics,
+        }
+
+
+tool_cache = ToolResultCache(TOOL_CACHE_TTL_SECONDS, TOOL_CACHE_MAX_ENTRIES)
@@ -0,0 +1,105 @@
+import aiohttp
+import mcp.types as types
+from typing import Any, Dict, List
+from urllib.parse import urlencode
+
+from .http_client import DATABASE_SERVICE_URL, database_session
+from .get_all_invoices import FILTERS, FORMAT_HEADERS, format_invoices
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 200
+SORTS = ["-date_created", "date_created", "-amount", "amount", "-due_date", "due_date"]
+
+def search_invoices_tool() -> types.Tool:
+    """
+    Definícia nástroja pre vyhľadanie faktúr.
+    """
+    return types.Tool(
+        name="search_invoices",
+        description=(
+            "Vyhľadá faktúry podľa filtrov priamo v databáze a vráti počet a súčet súm všetkých nájdených faktúr "
+            "spolu s prvými z nich v zvolenom poradí. Použi na otázky typu 'koľko a za koľko od dodávateľa X', "
+            "'faktúry splatné budúci týždeň' alebo '5 najvyšších faktúr' namiesto sťahovania všetkých faktúr."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "q": {"type": "string", "description": "Text v čísle faktúry alebo názve dodávateľa (bez ohľadu na veľkosť písmen)"},
+                "supplier": {"type": "string", "description": "Dodávateľ (presná zhoda)"},
+                "date_from": {"type": "string", "description": "Vytvorené od, YYYY-MM-DD"},
+                "date_to": {"type": "string", "description": "Vytvorené do, YYYY-MM-DD"},
+                "amount_min": {"type": "number", "description": "Minimálna suma v eurách"},
+                "amount_max": {"type": "number", "description": "Maximálna suma v eurách"},
+                "due_from": {"type": "string", "description": "Splatnosť od, YYYY-MM-DD"},
+                "due_to": {"type": "string", "description": "Splatnosť do, YYYY-MM-DD"},
+                "sort": {
+                    "type": "string",
+                    "enum": SORTS,
+                    "description": "Poradie, '-' znamená zostupne (predvolene -date_created, najnovšie prvé)"
+                },
+                "limit": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "maximum": MAX_LIMIT,
+                    "description": f"Koľko faktúr vypísať (predvolene {DEFAULT_LIMIT}); 0 = iba počet a súčet"
+                }
+            },
+            "required": []
+        },
+        annotations=types.ToolAnnotations(readOnlyHint=True)
+    )
+
+async def execute_search_invoices(**arguments) -> List[types.TextContent]:
+    """
+    Vykoná vyhľadanie faktúr cez /invoices/search databázového servisu.
+    """
+    try:
+        sort = arguments.get("sort") or "-date_created"
+        if sort not in SORTS:
+            return [types.TextContent(type="text", text=f"Neznáme poradie '{sort}', dostupné: {', '.join(SORTS)}")]
+        limit = arguments.get("limit")
+        limit = DEFAULT_LIMIT if limit is None else max(0, min(int(limit), MAX_LIMIT))
+
+        # Servis vracia aspoň jednu faktúru; pri limit=0 sa jednoducho nevypíše
+        params: Dict[str, Any] = {"sort": sort, "limit": max(limit, 1)}
+        for name in ["q", *FILTERS]:
+            if arguments.get(name) not in (None, ""):
+                params[name] = arguments[name]
+
+        session = database_session()
+        async with session.get(f"{DATABASE_SERVICE_URL}/invoices/search?{urlencode(params)}") as response:
+            if response.status != 200:
+                error_text = await response.text()
+                return [types.TextContent(
+                    type="text",
+                    text=f"Chyba pri vyhľadávaní faktúr: HTTP {response.status}\n{error_text}"
+                )]
+            result = await response.json()
+
+        matched = result["matched"]
+        if matched == 0:
+            return [types.TextContent(type="text", text="Žiadne faktúry nezodpovedajú zadaným filtrom.")]
+
+        invoices = result.get("items", [])[:limit]
+        lines = [f"Nájdené faktúry: {matched}, spolu {result['total_amount']:.2f} €"]
+        if invoices:
+            lines.append(f"Prvých {len(invoices)} (poradie {sort}):" if len(invoices) < matched else f"Všetky (poradie {sort}):")
+            lines.append(FORMAT_HEADERS["table"])
+            lines.extend(format_invoices(invoices, "table"))
+        return [types.TextContent(type="text", text="\n".join(lines))]
+
+    except (TypeError, ValueError) as e:
+        return [types.TextContent(
+            type="text",
+            text=f"Chybný parameter: {str(e)}"
+        )]
+    except aiohttp.ClientError as e:
+        return [types.TextContent(
+            type="text",
+            text=f"Chyba pri pripojení k databázovému servisu: {str(e)}"
+        )]
+    except Exception as e:
+        return [types.TextContent(
+            type="text",
+            text=f"Neočakávaná chyba: {str(e)}"
+        )]
@@ -0,0 +1,124 @@
+import aiohttp
+import mcp.types as types
+from typing import Any, Dict, List
+from urllib.parse import urlencode
+
+from .http_client import DATABASE_SERVICE_URL, database_session
+
+DEFAULT_TOP = 20
+MAX_TOP = 200
+
+# group_by -> (endpoint database_service, stĺpec skupiny, parametre, ktoré endpoint prijíma)
+GROUPINGS = {
+    "supplier": ("by-supplier", "supplier_name", ["supplier", "month_from", "month_to"]),
+    "month": ("by-month", "month", ["supplier", "month_from", "month_to"]),
+    "due": ("overdue", "bucket", ["supplier", "as_of"]),
+}
+BUCKET_LABELS = {
+    "not_due": "ešte nesplatné",
+    "1-30": "1-30 dní po splatnosti",
+    "31-60": "31-60 dní po splatnosti",
+    "61-90": "61-90 dní po splatnosti",
+    "90+": "viac ako 90 dní po splatnosti",
+}
+
+def summarize_invoices_tool() -> types.Tool:
+    """
+    Definícia nástroja pre súhrny faktúr.
+    """
+    return types.Tool(
+        name="summarize_invoices",
+        description=(
+            "Spočíta počet a súčet súm faktúr v databáze po skupinách: podľa dodávateľa, mesiaca vytvorenia "
+            "alebo dní po splatnosti (due). Použi na otázky o celkových sumách namiesto sťahovania všetkých faktúr. "
+            "Databáza neeviduje úhrady, 'po splatnosti' znamená iba dátum splatnosti v minulosti."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "group_by": {
+                    "type": "string",
+                    "enum": list(GROUPINGS),
+                    "description": "supplier = podľa dodávateľa, month = podľa mesiaca vytvorenia, due = podľa dní po splatnosti"
+                },
+                "supplier": {"type": "string", "description": "Iba tento dodávateľ (presná zhoda)"},
+                "month_from": {"type": "string", "description": "Vytvorené od mesiaca, YYYY-MM-DD (pre supplier a month)"},
+                "month_to": {"type": "string", "description": "Vytvorené do mesiaca vrátane, YYYY-MM-DD (pre supplier a month)"},
+                "as_of": {"type": "string", "description": "Ku dňu, YYYY-MM-DD (pre due, predvolene dnes)"},
+                "top": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "maximum": MAX_TOP,
+                    "description": f"Najviac skupín vo výpise (predvolene {DEFAULT_TOP}); celkový súčet zahŕňa všetky"
+                }
+            },
+            "required": ["group_by"]
+        },
+        annotations=types.ToolAnnotations(readOnlyHint=True)
+    )
+
+async def execute_summarize_invoices(**arguments) -> List[types.TextContent]:
+    """
+    Vykoná súhrn faktúr cez /invoices/summary/* databázového servisu.
+    """
+    try:
+        group_by = arguments.get("group_by")
+        if group_by not in GROUPINGS:
+            return [types.TextContent(type="text", text=f"Neznáme zoskupenie '{group_by}', dostupné: {', '.join(GROUPINGS)}")]
+        endpoint, column, accepted = GROUPINGS[group_by]
+        top = max(1, min(int(arguments.get("top") or DEFAULT_TOP), MAX_TOP))
+
+        params: Dict[str, Any] = {}
+        for name in accepted:
+            if arguments.get(name) not in (None, ""):
+                params[name] = arguments[name]
+        ignored = [name for name in ("supplier", "month_from", "month_to", "as_of")
+                   if name not in accepted and arguments.get(name) not in (None, "")]
+
+        url = f"{DATABASE_SERVICE_URL}/invoices/summary/{endpoint}"
+        if params:
+            url += f"?{urlencode(params)}"
+        session = database_session()
+        async with session.get(url) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                return [types.TextContent(
+                    type="text",
+                    text=f"Chyba pri súhrne faktúr: HTTP {response.status}\n{error_text}"
+                )]
+            summary = await response.json()
+
+        groups = summary.get("groups", [])
+        if not groups:
+            return [types.TextContent(type="text", text="Žiadne faktúry (pre zadané filtre).")]
+
+        lines = [f"Spolu: {summary['invoice_count']} faktúr, {summary['total_amount']:.2f} €"]
+        if ignored:
+            lines.append(f"Pre group_by={group_by} sa nepoužili: {', '.join(ignored)}")
+        lines.append(f"{column} | počet | suma €")
+        for group in groups[:top]:
+            name = BUCKET_LABELS.get(group[column], group[column]) if group_by == "due" else group[column]
+            lines.append(f"{name} | {group['invoice_count']} | {group['total_amount']:.2f}")
+        if len(groups) > top:
+            rest = groups[top:]
+            lines.append(
+                f"... ďalších {len(rest)} skupín: {sum(g['invoice_count'] for g in rest)} faktúr, "
+                f"{sum(g['total_amount'] for g in rest):.2f} €"
+            )
+        return [types.TextContent(type="text", text="\n".join(lines))]
+
+    except (TypeError, ValueError) as e:
+        return [types.TextContent(
+            type="text",
+            text=f"Chybný parameter: {str(e)}"
+        )]
+    except aiohttp.ClientError as e:
+        return [types.TextContent(
+            type="text",
+            text=f"Chyba pri pripojení k databázovému servisu: {str(e)}"
+        )]
+    except Exception as e:
+        return [types.TextContent(
+            type="text",
+            text=f"Neočakávaná chyba: {str(e)}"
+        )]